@@ -12,20 +12,30 @@ Features:
 
 import os
 import json
+import gzip
+import hashlib
 import sqlite3
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, timezone
 from pathlib import Path
 from dotenv import load_dotenv
-from flask import Flask, render_template, jsonify, g
+from flask import Flask, render_template, jsonify, g, request, Response
 import requests
 import pandas as pd
 import numpy as np
 import plotly.graph_objs as go
 import plotly.express as px
 from dateutil.relativedelta import relativedelta
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from bisect import bisect_left
+import queue
+import threading
 import time
 
+try:
+    import brotli  # optional: brotli-compressed responses and export files
+except ImportError:
+    brotli = None
+
 load_dotenv()
 
 app = Flask(__name__)
@@ -44,34 +54,407 @@ DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 PORT = config.get('port') or int(os.getenv('PORT', '5001'))
 START_DATE = datetime.strptime(config.get('since') or os.getenv('START_DATE', '2021-01-01'), '%Y-%m-%d').date()
 DB_PATH = Path(config.get('database') or os.getenv('DB_PATH', './cache/stats.db'))
-REQUEST_DELAY = float(os.getenv('REQUEST_DELAY', '0.1'))
+LOC_WORKERS = int(os.getenv('LOC_WORKERS', '8'))
+LOC_BACKEND = os.getenv('LOC_BACKEND', 'graphql')  # 'graphql' (batched, REST fallback) or 'rest'
+GRAPHQL_BATCH_SIZE = int(os.getenv('GRAPHQL_BATCH_SIZE', '100'))
+LOC_RETRY_MAX_DAYS = int(os.getenv('LOC_RETRY_MAX_DAYS', '30'))  # longest backoff for commits whose LOC fetch failed
+SYNC_WORKERS = int(os.getenv('SYNC_WORKERS', '4'))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))  # background fetch jobs run at once
+# Incremental syncs search from this long before the watermark, for commits GitHub indexes late
+SYNC_OVERLAP_MINUTES = int(os.getenv('SYNC_OVERLAP_MINUTES', '60'))
+DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', '30'))  # seconds a writer waits for the lock
+RESPONSE_CACHE_MB = int(os.getenv('RESPONSE_CACHE_MB', '64'))
+SQLJS_PAGE_SIZE = int(os.getenv('SQLJS_PAGE_SIZE', '4096'))  # page size of the database served to sql.js
 APP_TITLE = config.get('title', 'GitHub Stats')
 
 # API Headers
 HEADERS = {'Authorization': f'bearer {GITHUB_TOKEN}', 'Accept': 'application/vnd.github.v3+json'}
 REST_HEADERS = {'Authorization': f'token {GITHUB_TOKEN}', 'Accept': 'application/vnd.github.v3+json'}
 SEARCH_HEADERS = {'Authorization': f'token {GITHUB_TOKEN}', 'Accept': 'application/vnd.github.cloak-preview'}
+GRAPHQL_URL = 'https://api.github.com/graphql'
+
+# The search API returns at most 1000 results per query, 100 per page
+SEARCH_RESULT_CAP = 1000
+SEARCH_PAGE_SIZE = 100
+
+# LOC backfill goes first to commits inside the dashboard's period windows (and
+# the 30 days before the last 30, for its change figure), plus the year to date
+LOC_PRIORITY_WINDOWS = (7, 30, 60, 90, 365)
+
+# Shared keep-alive session so requests reuse pooled TLS connections
+HTTP = requests.Session()
+HTTP.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(LOC_WORKERS, 10)))
 
 # Ensure cache directory exists
 DB_PATH.parent.mkdir(exist_ok=True)
 
 
+def iter_concurrent(func, items, workers: int):
+    """Run func over items on `workers` daemon threads, yielding (item, result, error) as each completes.
+
+    Items are handed out one at a time, so at most `workers` calls are in flight and no
+    new work starts once the consumer stops iterating. Unlike ThreadPoolExecutor, the
+    daemon threads never hold up interpreter exit (e.g. while the startup sync runs).
+    """
+    items = iter(items)
+    lock = threading.Lock()
+    stop = threading.Event()
+    results = queue.Queue()
+    finished = object()
+
+    def worker():
+        while not stop.is_set():
+            with lock:
+                item = next(items, finished)
+            if item is finished:
+                break
+            try:
+                results.put((item, func(item), None))
+            except Exception as e:
+                results.put((item, None, e))
+        results.put(finished)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(workers, 1))]
+    for thread in threads:
+        thread.start()
+    try:
+        running = len(threads)
+        while running:
+            result = results.get()
+            if result is finished:
+                running -= 1
+            else:
+                yield result
+    finally:
+        stop.set()
+
+
+def split_date_range(start_date, end_date, pieces: int) -> list:
+    """Split an inclusive date range into up to `pieces` contiguous, near-equal ranges."""
+    days = (end_date - start_date).days + 1
+    pieces = max(1, min(pieces, days))
+    ranges = []
+    offset = 0
+    for i in range(pieces):
+        length = days // pieces + (1 if i < days % pieces else 0)
+        ranges.append((start_date + timedelta(days=offset), start_date + timedelta(days=offset + length - 1)))
+        offset += length
+    return ranges
+
+
+def utc_timestamp(value) -> str:
+    """An ISO 8601 timestamp or aware datetime as 'YYYY-MM-DDTHH:MM:SS+00:00' in UTC, or None.
+
+    GitHub reports committer dates in the committer's offset; normalizing them
+    makes string comparison (MAX in SQL, watermarks) match time order.
+    """
+    try:
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def compute_streaks(dates: list, today: date = None, top: int = 5) -> dict:
+    """Current, longest and top-N runs of consecutive days in sorted, distinct ISO dates.
+
+    Dates become integer day ordinals; a run starts wherever the gap to the
+    previous day isn't exactly one, so every run falls out of a single diff.
+    The current streak is the last run if it reaches today or yesterday.
+    """
+    streaks = {'current': 0, 'longest': 0, 'top': []}
+    if not dates:
+        return streaks
+
+    days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+    starts = np.flatnonzero(np.diff(days, prepend=days[0] - 2) != 1)
+    ends = np.append(starts[1:], len(days)) - 1
+    lengths = ends - starts + 1
+
+    today = np.datetime64(today or date.today(), 'D').astype(np.int64)
+    if today - days[-1] in (0, 1):
+        streaks['current'] = int(lengths[-1])
+    streaks['longest'] = int(lengths.max())
+    # Longest first, most recent first among equal lengths
+    for i in np.lexsort((-starts, -lengths))[:top]:
+        streaks['top'].append({
+            'length': int(lengths[i]),
+            'start': dates[starts[i]],
+            'end': dates[ends[i]],
+        })
+    return streaks
+
+
+# Per-day counters in a stats partial, one int64 array each, aligned with 'days'
+PARTIAL_DAY_FIELDS = ('commits', 'with_loc', 'additions', 'deletions')
+
+
+def merge_stats_partials(partials: list) -> dict:
+    """Combine per-user stats partials (see StatsDB.stats_partial) into one.
+
+    Active days are unioned with their counters summed and each repo keeps
+    its latest commit date, so the merge is exactly the partial of the
+    users' commits taken together: distinct days, streaks and distinct repos
+    included.
+    """
+    if len(partials) == 1:
+        return partials[0]
+    days, inverse = np.unique(np.concatenate([p['days'] for p in partials]), return_inverse=True)
+    merged = {'days': days}
+    for field in PARTIAL_DAY_FIELDS:
+        merged[field] = np.zeros(len(days), dtype=np.int64)
+        np.add.at(merged[field], inverse, np.concatenate([p[field] for p in partials]))
+    repo_last = {}
+    for partial in partials:
+        for repo, last in partial['repo_last'].items():
+            if last > repo_last.get(repo, ''):
+                repo_last[repo] = last
+    merged['repo_last'] = repo_last
+    return merged
+
+
+def stats_from_partial(partial: dict) -> dict:
+    """The get_stats metrics of a stats partial.
+
+    Sums over period windows are suffix sums of the sorted days, and yearly
+    and weekday totals are grouped straight from the day ordinals.
+    """
+    days = partial['days']
+    commits, with_loc_days, additions, deletions = (partial[f] for f in PARTIAL_DAY_FIELDS)
+    all_dates = days.astype('datetime64[D]').astype(str).tolist()
+
+    total = int(commits.sum())
+    with_loc = int(with_loc_days.sum())
+    total_additions = int(additions.sum())
+    total_deletions = int(deletions.sum())
+    first_commit = all_dates[0] if all_dates else None
+    last_commit = all_dates[-1] if all_dates else None
+    active_days = len(days)
+    max_day = int(np.argmax(commits)) if active_days else None
+    # StatsDB stores additions and deletions together (or neither), so these sums cover with_loc commits
+    avg_loc = (total_additions + total_deletions) / with_loc if with_loc else 0
+
+    weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    weekdays = (days + 3) % 7  # day 0 (1970-01-01) was a Thursday
+    dow_counts = np.bincount(weekdays, weights=commits, minlength=7).astype(np.int64)
+    # Busiest first, ties in SQLite's %w order (Sunday first); only weekdays with activity
+    dow_stats = sorted(((int(wd), int(dow_counts[wd])) for wd in np.unique(weekdays)),
+                       key=lambda item: (-item[1], (item[0] + 1) % 7))
+
+    yearly = {}
+    years = days.astype('datetime64[D]').astype('datetime64[Y]')
+    if active_days:
+        year_keys, year_starts = np.unique(years, return_index=True)
+        year_sums = {f: np.add.reduceat(partial[f], year_starts) for f in ('commits', 'additions', 'deletions')}
+        year_days = np.diff(np.append(year_starts, active_days))
+        for i, year in enumerate(year_keys.astype(str)):
+            yearly[year] = {
+                'commits': int(year_sums['commits'][i]),
+                'additions': int(year_sums['additions'][i]),
+                'deletions': int(year_sums['deletions'][i]),
+                'net_loc': int(year_sums['additions'][i] - year_sums['deletions'][i]),
+                'days_active': int(year_days[i]),
+            }
+
+    # Time period metrics: days are sorted, so each window is a suffix
+    today = datetime.now()
+    periods = {
+        '7d': (today - timedelta(days=7)).strftime('%Y-%m-%d'),
+        '30d': (today - timedelta(days=30)).strftime('%Y-%m-%d'),
+        '90d': (today - timedelta(days=90)).strftime('%Y-%m-%d'),
+        'ytd': datetime(today.year, 1, 1).strftime('%Y-%m-%d'),
+        '1y': (today - timedelta(days=365)).strftime('%Y-%m-%d'),
+    }
+    repo_last = partial['repo_last']
+    period_stats = {}
+    for period, start_date in periods.items():
+        start = bisect_left(all_dates, start_date)
+        period_stats[period] = {
+            'commits': int(commits[start:].sum()),
+            'additions': int(additions[start:].sum()),
+            'deletions': int(deletions[start:].sum()),
+            'active_days': active_days - start,
+            'repos': sum(1 for last in repo_last.values() if last >= start_date),
+        }
+
+    # 30-day comparison for change calculation
+    sixty_days_ago = (today - timedelta(days=60)).strftime('%Y-%m-%d')
+    prev_start = bisect_left(all_dates, sixty_days_ago)
+    prev_end = bisect_left(all_dates, periods['30d'])
+    prev_30d = {'adds': int(additions[prev_start:prev_end].sum()), 'dels': int(deletions[prev_start:prev_end].sum())}
+
+    streaks = compute_streaks(all_dates, today.date())
+
+    # Calculate percentage change
+    additions_30d_change = 0
+    deletions_30d_change = 0
+    last_30d_adds = period_stats['30d']['additions']
+    last_30d_dels = period_stats['30d']['deletions']
+    if prev_30d['adds'] > 0:
+        additions_30d_change = round(((last_30d_adds - prev_30d['adds']) / prev_30d['adds']) * 100, 0)
+    elif last_30d_adds > 0:
+        additions_30d_change = 100
+    if prev_30d['dels'] > 0:
+        deletions_30d_change = round(((last_30d_dels - prev_30d['dels']) / prev_30d['dels']) * 100, 0)
+    elif last_30d_dels > 0:
+        deletions_30d_change = 100
+
+    # Calculate derived stats
+    first_date = datetime.strptime(first_commit, '%Y-%m-%d') if first_commit else datetime.now()
+    last_date = datetime.strptime(last_commit, '%Y-%m-%d') if last_commit else datetime.now()
+    total_days = (last_date - first_date).days + 1 if first_commit else 0
+    years_coding = (datetime.now() - first_date).days / 365.25 if first_commit else 0
+
+    return {
+        'total_commits': total,
+        'with_loc': with_loc,
+        'missing_loc': total - with_loc,
+        'total_additions': total_additions,
+        'total_deletions': total_deletions,
+        'net_loc_change': total_additions - total_deletions,
+        'first_commit': first_commit,
+        'last_commit': last_commit,
+        'total_days': total_days,
+        'active_days': active_days,
+        'unique_repos': len(repo_last),
+        'years_coding': round(years_coding, 1),
+        'average_commits': round(total / max(active_days, 1), 1),
+        'average_loc_per_commit': round(avg_loc, 0),
+        'maximum_commits': int(commits[max_day]) if max_day is not None else 0,
+        'max_commit_date': all_dates[max_day] if max_day is not None else None,
+        'current_streak': streaks['current'],
+        'longest_streak': streaks['longest'],
+        'top_streaks': streaks['top'],
+        'most_productive_day': weekday_names[dow_stats[0][0]] if dow_stats else None,
+        'day_of_week_stats': {weekday_names[weekday]: commits for weekday, commits in dow_stats},
+        'yearly': yearly,
+        # Time period metrics
+        'periods': period_stats,
+        'additions_30d_change': additions_30d_change,
+        'deletions_30d_change': deletions_30d_change,
+    }
+
+
+# Owner and name halves of an 'owner/name' repo; owner is NULL for bare names
+REPO_OWNER_SQL = "CASE WHEN instr(repo, '/') > 0 THEN substr(repo, 1, instr(repo, '/') - 1) END"
+REPO_NAME_SQL = "substr(repo, instr(repo, '/') + 1)"
+
+# Full-text index over commit messages and repo names. External content: the
+# text lives only in commits, the index refers to rows by rowid. commits has no
+# INTEGER PRIMARY KEY here, so VACUUM may renumber its rowids: StatsDB.vacuum
+# rebuilds the index afterwards, and a manual VACUUM needs --rebuild-search
+COMMITS_FTS_SCHEMA = '''
+    CREATE VIRTUAL TABLE commits_fts USING fts5(
+        message, repo, content='commits', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+'''
+
+# Keep commits_fts in step with commits row by row, whatever writes them; LOC
+# updates don't touch the indexed columns, so they don't fire
+COMMITS_FTS_TRIGGERS = '''
+    CREATE TRIGGER IF NOT EXISTS commits_fts_insert AFTER INSERT ON commits BEGIN
+        INSERT INTO commits_fts (rowid, message, repo) VALUES (new.rowid, new.message, new.repo);
+    END;
+    CREATE TRIGGER IF NOT EXISTS commits_fts_delete AFTER DELETE ON commits BEGIN
+        INSERT INTO commits_fts (commits_fts, rowid, message, repo)
+        VALUES ('delete', old.rowid, old.message, old.repo);
+    END;
+    CREATE TRIGGER IF NOT EXISTS commits_fts_update AFTER UPDATE OF message, repo ON commits BEGIN
+        INSERT INTO commits_fts (commits_fts, rowid, message, repo)
+        VALUES ('delete', old.rowid, old.message, old.repo);
+        INSERT INTO commits_fts (rowid, message, repo) VALUES (new.rowid, new.message, new.repo);
+    END;
+'''
+
+
+# Match delimiters for FTS5 snippet(); control characters, so no message text is
+# mistaken for a highlight and nothing reaches clients as markup
+SNIPPET_MARKS = ('\x02', '\x03')
+
+
+def split_snippet(marked: str) -> tuple:
+    """Plain text and [start, end) match offsets of a snippet delimited by SNIPPET_MARKS."""
+    start_mark, end_mark = SNIPPET_MARKS
+    text, highlights, start = [], [], None
+    length = 0
+    for ch in marked:
+        if ch == start_mark:
+            start = length
+        elif ch == end_mark and start is not None:
+            highlights.append([start, length])
+            start = None
+        else:
+            text.append(ch)
+            length += 1
+    return ''.join(text), highlights
+
+
+def fts_query(text: str) -> str:
+    """FTS5 MATCH expression for free-text search input.
+
+    Every word is quoted, so FTS operators and punctuation in the input are
+    taken literally, and matched as a prefix ("fix pars" finds "Fix parser").
+    Empty if the input has nothing searchable.
+    """
+    terms = [t for t in text.split() if any(ch.isalnum() for ch in t)]
+    return ' '.join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
 class StatsDB:
     """SQLite database for GitHub stats with rich query support."""
     
     def __init__(self, db_path: Path = DB_PATH):
         self.db_path = db_path
+        self._local = threading.local()
+        self._partials = {}  # username -> (generation, stats_partial)
+        self._partials_lock = threading.Lock()
         self._init_db()
     
-    def _get_conn(self):
-        """Get thread-local connection."""
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self, readonly: bool = False):
+        """Open a new connection with the shared pragmas applied."""
+        if readonly:
+            uri = f'{Path(self.db_path).resolve().as_uri()}?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, timeout=DB_BUSY_TIMEOUT)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT)
         conn.row_factory = sqlite3.Row
+        # WAL (set in _init_db) only needs NORMAL sync to stay consistent after a crash
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA cache_size = -65536')  # 64 MB
+        conn.execute('PRAGMA temp_store = MEMORY')
+        return conn
+
+    def _get_conn(self):
+        """Get this thread's read-write connection, opened on first use.
+
+        Connections live as long as their thread and are never closed by callers.
+        Writes go through `with conn:` so a failure rolls back instead of leaving
+        the shared connection holding the write lock.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _get_read_conn(self):
+        """Get this thread's read-only connection, opened on first use.
+
+        Under WAL a reader sees the last committed snapshot and never waits on,
+        or holds up, a writer, so dashboard queries stay responsive during a sync.
+        """
+        conn = getattr(self._local, 'read_conn', None)
+        if conn is None:
+            conn = self._local.read_conn = self._connect(readonly=True)
         return conn
     
     def _init_db(self):
         """Initialize database schema."""
         conn = self._get_conn()
+        conn.execute('PRAGMA journal_mode = WAL')
         conn.executescript('''
             -- Users table with profile info
             CREATE TABLE IF NOT EXISTS users (
@@ -102,6 +485,19 @@ class StatsDB:
                 fetched_at TEXT,
                 FOREIGN KEY (username) REFERENCES users(username)
             );
+
+            -- Per-user daily totals, refreshed with every commit write; distinct repo
+            -- counts across days still come from commits (idx_commits_user_date_repo)
+            CREATE TABLE IF NOT EXISTS daily_rollup (
+                username TEXT NOT NULL,
+                date TEXT NOT NULL,
+                commits INTEGER DEFAULT 0,
+                additions INTEGER DEFAULT 0,
+                deletions INTEGER DEFAULT 0,
+                repo_count INTEGER DEFAULT 0,
+                loc_commits INTEGER DEFAULT 0,
+                PRIMARY KEY (username, date)
+            ) WITHOUT ROWID;
             
             -- Repos metadata table (aggregated stats + GitHub API metadata)
             CREATE TABLE IF NOT EXISTS repos (
@@ -140,6 +536,38 @@ class StatsDB:
                 PRIMARY KEY (username, year_month)
             );
 
+            -- Search pages saved during a sync, so an interrupted month resumes at the
+            -- page it stopped on; cleared when the month is recorded in fetch_meta
+            CREATE TABLE IF NOT EXISTS sync_pages (
+                username TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                total_count INTEGER,
+                found INTEGER,
+                fetched_at TEXT,
+                PRIMARY KEY (username, start_date, end_date, page)
+            ) WITHOUT ROWID;
+
+            -- Latest committer timestamp (UTC) seen per user; incremental syncs of the
+            -- current month search only for commits after it
+            CREATE TABLE IF NOT EXISTS sync_watermarks (
+                username TEXT PRIMARY KEY,
+                committed_at TEXT NOT NULL,
+                updated_at TEXT
+            );
+
+            -- Commits still missing LOC, in backfill order, with retry state for failures
+            CREATE TABLE IF NOT EXISTS loc_queue (
+                sha TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                priority REAL NOT NULL DEFAULT 0,
+                attempts INTEGER DEFAULT 0,
+                next_attempt TEXT  -- UTC; NULL when it can be fetched now
+            );
+            CREATE INDEX IF NOT EXISTS idx_loc_queue_priority ON loc_queue(priority DESC);
+            CREATE INDEX IF NOT EXISTS idx_loc_queue_user_priority ON loc_queue(username, priority DESC);
+
             -- Languages per repo
             CREATE TABLE IF NOT EXISTS languages (
                 repo TEXT NOT NULL,
@@ -159,20 +587,68 @@ class StatsDB:
                 PRIMARY KEY (repo, topic)
             );
 
+            -- Bookkeeping counters; 'generation' goes up with every data write
+            CREATE TABLE IF NOT EXISTS db_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER DEFAULT 0
+            );
+
+            -- Validators and bodies for conditional GitHub API requests
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT,
+                fetched_at TEXT
+            );
+
+            -- Background fetch jobs; params is canonical JSON, so identical requests match
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, complete, error
+                created_at TEXT,
+                started_at TEXT,
+                finished_at TEXT
+            );
+            -- At most one queued or running job per (kind, params); submitting again joins it
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active ON jobs(kind, params)
+                WHERE status IN ('queued', 'running');
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id);
+
+            -- Progress events of each job, kept so every subscriber can replay them
+            CREATE TABLE IF NOT EXISTS job_events (
+                job_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            ) WITHOUT ROWID;
+
             -- Indexes for fast queries
-            CREATE INDEX IF NOT EXISTS idx_commits_user_date ON commits(username, date);
-            CREATE INDEX IF NOT EXISTS idx_commits_repo ON commits(repo);
+            -- (username, date, repo) serves per-user date ranges and, index-only, distinct repos
+            DROP INDEX IF EXISTS idx_commits_user_date;
+            CREATE INDEX IF NOT EXISTS idx_commits_user_date_repo ON commits(username, date, repo);
+            -- (repo, date) serves per-repo lookups and their date-ordered listings
+            DROP INDEX IF EXISTS idx_commits_repo;
+            CREATE INDEX IF NOT EXISTS idx_commits_repo_date ON commits(repo, date);
             CREATE INDEX IF NOT EXISTS idx_commits_date ON commits(date);
             CREATE INDEX IF NOT EXISTS idx_repos_username ON repos(username);
         ''')
         conn.commit()
 
         # Migrations: Add missing columns to existing tables
+        # owner is the org half of repo, generated so org lookups can use an index;
+        # NOCASE like GitHub's own logins (and the repo LIKE 'org/%' it replaces)
+        owner_column = f'TEXT COLLATE NOCASE GENERATED ALWAYS AS ({REPO_OWNER_SQL}) VIRTUAL'
         migrations = [
             ('repos', 'fetched_at', 'TEXT'),
             ('commits', 'fetched_at', 'TEXT'),
             ('languages', 'fetched_at', 'TEXT'),
             ('topics', 'fetched_at', 'TEXT'),
+            ('commits', 'owner', owner_column),
+            ('languages', 'owner', owner_column),
+            ('topics', 'owner', owner_column),
         ]
         for table, column, col_type in migrations:
             try:
@@ -180,357 +656,784 @@ class StatsDB:
                 conn.commit()
             except sqlite3.OperationalError:
                 pass  # Column already exists
+        conn.executescript('''
+            CREATE INDEX IF NOT EXISTS idx_commits_owner_date ON commits(owner, date);
+            CREATE INDEX IF NOT EXISTS idx_languages_owner ON languages(owner);
+            CREATE INDEX IF NOT EXISTS idx_topics_owner ON topics(owner);
+        ''')
 
-        conn.close()
+        # Databases from before daily_rollup existed get it built once
+        if (conn.execute('SELECT 1 FROM commits LIMIT 1').fetchone()
+                and not conn.execute('SELECT 1 FROM daily_rollup LIMIT 1').fetchone()):
+            self.rebuild_daily_rollup()
+        self._repair_half_locs(conn)
+
+        self.fts = self._init_search_index(conn)
+
+    def _repair_half_locs(self, conn):
+        """Clear LOC on commits that have only one of additions and deletions, once.
+
+        LOC is written for both columns together (see _insert_commits and
+        update_commit_locs), so the rollup's loc_commits and LOC sums cover the
+        same commits. Rows written before that was enforced go back to the LOC
+        queue, which is rescored on its next refresh.
+        """
+        if conn.execute("SELECT 1 FROM db_meta WHERE key = 'loc_pairs_checked'").fetchone():
+            return
+        with conn:
+            days = {tuple(r) for r in conn.execute(
+                'SELECT username, date FROM commits WHERE (additions IS NULL) != (deletions IS NULL)'
+            )}
+            if days:
+                conn.execute('''
+                    UPDATE commits SET additions = NULL, deletions = NULL
+                    WHERE (additions IS NULL) != (deletions IS NULL)
+                ''')
+                self._refresh_daily_rollup(conn, days)
+                conn.execute("DELETE FROM db_meta WHERE key = 'loc_queue_day'")
+                self._bump_generation(conn)
+            conn.execute("INSERT INTO db_meta (key, value) VALUES ('loc_pairs_checked', 1)")
+
+    def _init_search_index(self, conn) -> bool:
+        """Create commits_fts and its triggers, indexing any existing commits; False without FTS5.
+
+        Databases indexed before the triggers existed are reindexed once too.
+        """
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'commits_fts_insert'").fetchone():
+            return True
+        try:
+            with conn:
+                if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'commits_fts'").fetchone():
+                    conn.execute(COMMITS_FTS_SCHEMA)
+                conn.executescript(COMMITS_FTS_TRIGGERS)
+        except sqlite3.OperationalError:
+            return False  # SQLite built without FTS5; search_commits scans instead
+        self.rebuild_search_index()
+        return True
     
+    def checkpoint(self):
+        """Fold the WAL back into the main database file so it can be read on its own."""
+        self._get_conn().execute('PRAGMA wal_checkpoint(PASSIVE)')
+
+    def backup(self, path: Path):
+        """Write a consistent copy of the full database to path, WAL included.
+
+        Unlike export_sqljs this keeps every table and column, so the copy can
+        be restored as DB_PATH and synced onward.
+        """
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.unlink(missing_ok=True)
+        dest = sqlite3.connect(tmp)
+        try:
+            self._get_read_conn().backup(dest)
+        finally:
+            dest.close()
+        tmp.replace(path)
+
+    def export_sqljs(self, path: Path) -> int:
+        """Write a read-optimized copy of the database for sql.js to path.
+
+        Only what the dashboard queries is kept: profiles, commits without url
+        or fetched_at and with messages cut to their first line, languages,
+        topics, daily_rollup, a per-user, per-repo repo_rollup and the
+        commits_fts search index over the shortened messages. Commits,
+        languages, topics and repo_rollup carry the repo's owner (and
+        repo_rollup its name) so org views are indexed lookups. Commits are
+        stored in (username, date) order so a user's rows share pages, and the
+        file is ANALYZEd and VACUUMed at SQLJS_PAGE_SIZE. Returns the data
+        generation it was built from, which is also kept as PRAGMA user_version.
+        """
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.unlink(missing_ok=True)
+        dest = sqlite3.connect(tmp, uri=True, isolation_level=None)
+        dest.execute(f'PRAGMA page_size = {SQLJS_PAGE_SIZE}')
+        dest.execute('ATTACH DATABASE ? AS src', (f'{Path(self.db_path).resolve().as_uri()}?mode=ro',))
+        dest.execute('BEGIN')  # one read snapshot of src for every copy below
+        for statement in (
+            '''CREATE TABLE users (
+                username TEXT PRIMARY KEY, avatar_url TEXT, name TEXT, bio TEXT,
+                company TEXT, location TEXT, blog TEXT, followers INTEGER,
+                following INTEGER, public_repos INTEGER, created_at TEXT
+            ) WITHOUT ROWID''',
+            '''INSERT INTO users SELECT username, avatar_url, name, bio, company, location, blog,
+                followers, following, public_repos, created_at FROM src.users''',
+            # id is the rowid commits_fts refers to; as an INTEGER PRIMARY KEY,
+            # the VACUUM below can't renumber it
+            '''CREATE TABLE commits (
+                sha TEXT, username TEXT, date TEXT, repo TEXT, message TEXT,
+                additions INTEGER, deletions INTEGER, owner TEXT, id INTEGER PRIMARY KEY
+            )''',
+            f'''INSERT INTO commits (sha, username, date, repo, message, additions, deletions, owner)
+                SELECT sha, username, date, repo,
+                    rtrim(substr(message, 1, instr(message || char(10), char(10)) - 1), char(13)),
+                    additions, deletions, {REPO_OWNER_SQL}
+                FROM src.commits ORDER BY username, date''',
+            '''CREATE TABLE daily_rollup (
+                username TEXT NOT NULL, date TEXT NOT NULL, commits INTEGER, additions INTEGER,
+                deletions INTEGER, repo_count INTEGER, loc_commits INTEGER,
+                PRIMARY KEY (username, date)
+            ) WITHOUT ROWID''',
+            'INSERT INTO daily_rollup SELECT * FROM src.daily_rollup',
+            '''CREATE TABLE repo_rollup (
+                username TEXT NOT NULL, repo TEXT NOT NULL, commits INTEGER, additions INTEGER,
+                deletions INTEGER, first_commit TEXT, last_commit TEXT, owner TEXT, name TEXT,
+                PRIMARY KEY (username, repo)
+            ) WITHOUT ROWID''',
+            f'''INSERT INTO repo_rollup
+                SELECT username, repo, COUNT(*), COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0),
+                    MIN(date), MAX(date), {REPO_OWNER_SQL}, {REPO_NAME_SQL}
+                FROM src.commits WHERE repo IS NOT NULL AND repo != '' GROUP BY username, repo''',
+            '''CREATE TABLE languages (
+                repo TEXT NOT NULL, username TEXT NOT NULL, language TEXT NOT NULL, bytes INTEGER,
+                owner TEXT, PRIMARY KEY (repo, language)
+            ) WITHOUT ROWID''',
+            f'INSERT INTO languages SELECT repo, username, language, bytes, {REPO_OWNER_SQL} FROM src.languages',
+            '''CREATE TABLE topics (
+                repo TEXT NOT NULL, username TEXT NOT NULL, topic TEXT NOT NULL, owner TEXT,
+                PRIMARY KEY (repo, topic)
+            ) WITHOUT ROWID''',
+            f'INSERT INTO topics SELECT repo, username, topic, {REPO_OWNER_SQL} FROM src.topics',
+            # Per-user scans (every dashboard chart); org and repo drill-down charts
+            # read covering index ranges instead of the commits table
+            'CREATE INDEX idx_commits_user_date ON commits(username, date)',
+            'CREATE INDEX idx_commits_repo ON commits(repo, date, additions, deletions)',
+            'CREATE INDEX idx_commits_owner ON commits(owner, date, repo, additions, deletions)',
+            'CREATE INDEX idx_repo_rollup_owner ON repo_rollup(owner)',
+            'CREATE INDEX idx_languages_owner ON languages(owner)',
+            'CREATE INDEX idx_topics_owner ON topics(owner)',
+        ):
+            dest.execute(statement)
+        if self.fts:
+            # The same full-text index as here, so client-side queries can MATCH too
+            dest.execute(COMMITS_FTS_SCHEMA)
+            dest.execute("INSERT INTO commits_fts (commits_fts) VALUES ('rebuild')")
+        generation = dest.execute(
+            "SELECT COALESCE(MAX(value), 0) FROM src.db_meta WHERE key = 'generation'"
+        ).fetchone()[0]
+        dest.execute('COMMIT')
+        dest.execute('DETACH DATABASE src')
+        dest.execute(f'PRAGMA user_version = {int(generation)}')
+        dest.execute('ANALYZE')
+        dest.execute('VACUUM')
+        dest.close()
+        tmp.replace(path)
+        return generation
+
+    def _refresh_daily_rollup(self, conn, days):
+        """Recompute daily_rollup rows for (username, date) pairs from their commits.
+
+        Runs inside the caller's transaction so the rollup commits or rolls back
+        together with the commit rows it summarizes.
+        """
+        conn.executemany('''
+            INSERT OR REPLACE INTO daily_rollup
+            (username, date, commits, additions, deletions, repo_count, loc_commits)
+            SELECT username, date, COUNT(*), COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0),
+                COUNT(DISTINCT repo), COUNT(additions)
+            FROM commits WHERE username = ? AND date = ?
+            GROUP BY username, date
+        ''', days)
+
+    def _bump_generation(self, conn):
+        """Advance the data generation inside the caller's write transaction."""
+        conn.execute('''
+            INSERT INTO db_meta (key, value) VALUES ('generation', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+        ''')
+
+    def generation(self) -> int:
+        """Counter that changes whenever commits, profiles or repo metadata are written.
+
+        Stored in the database, so writes from another process (e.g. a CLI
+        --fetch-loc run) invalidate the web server's response cache too.
+        """
+        row = self._get_read_conn().execute("SELECT value FROM db_meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def rebuild_daily_rollup(self) -> int:
+        """Rebuild daily_rollup from scratch. Returns the number of rollup rows."""
+        conn = self._get_conn()
+        with conn:
+            conn.execute('DELETE FROM daily_rollup')
+            conn.execute('''
+                INSERT INTO daily_rollup
+                (username, date, commits, additions, deletions, repo_count, loc_commits)
+                SELECT username, date, COUNT(*), COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0),
+                    COUNT(DISTINCT repo), COUNT(additions)
+                FROM commits GROUP BY username, date
+            ''')
+            self._bump_generation(conn)
+        return conn.execute('SELECT COUNT(*) FROM daily_rollup').fetchone()[0]
+
+    def vacuum(self):
+        """VACUUM the database, then rebuild what refers to commits by rowid, which VACUUM may renumber.
+
+        That is commits_fts, and loc_queue's record of the rows it has seen,
+        which is dropped so the next refresh_loc_queue rescores everything.
+        """
+        conn = self._get_conn()
+        conn.execute('VACUUM')
+        with conn:
+            conn.execute("DELETE FROM db_meta WHERE key = 'loc_queue_day'")
+        if self.fts:
+            self.rebuild_search_index()
+
+    def rebuild_search_index(self) -> int:
+        """Rebuild commits_fts from commits. Returns the number of commits indexed."""
+        conn = self._get_conn()
+        with conn:
+            conn.execute("INSERT INTO commits_fts (commits_fts) VALUES ('rebuild')")
+        return conn.execute('SELECT COUNT(*) FROM commits').fetchone()[0]
+
     def save_user(self, user_data: dict):
         """Save user profile data."""
         conn = self._get_conn()
-        conn.execute('''
-            INSERT OR REPLACE INTO users 
-            (username, avatar_url, name, bio, company, location, blog, 
-             followers, following, public_repos, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_data.get('login'),
-            user_data.get('avatar_url'),
-            user_data.get('name'),
-            user_data.get('bio'),
-            user_data.get('company'),
-            user_data.get('location'),
-            user_data.get('blog'),
-            user_data.get('followers', 0),
-            user_data.get('following', 0),
-            user_data.get('public_repos', 0),
-            user_data.get('created_at'),
-            datetime.now().isoformat()
-        ))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO users 
+                (username, avatar_url, name, bio, company, location, blog, 
+                 followers, following, public_repos, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user_data.get('login'),
+                user_data.get('avatar_url'),
+                user_data.get('name'),
+                user_data.get('bio'),
+                user_data.get('company'),
+                user_data.get('location'),
+                user_data.get('blog'),
+                user_data.get('followers', 0),
+                user_data.get('following', 0),
+                user_data.get('public_repos', 0),
+                user_data.get('created_at'),
+                datetime.now().isoformat()
+            ))
+            self._bump_generation(conn)
     
     def get_user(self, username: str) -> dict:
         """Get user profile data."""
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         row = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
-        conn.close()
         return dict(row) if row else None
+
+    def get_users(self, usernames: list) -> dict:
+        """Get profile data for several users, keyed by username."""
+        conn = self._get_read_conn()
+        placeholders = ','.join(['?' for _ in usernames])
+        rows = conn.execute(f'SELECT * FROM users WHERE username IN ({placeholders})', usernames).fetchall()
+        return {r['username']: dict(r) for r in rows}
+
+    def get_user_totals(self, usernames: list = None) -> dict:
+        """Headline totals per user from daily_rollup, keyed by username."""
+        conn = self._get_read_conn()
+        query = '''
+            SELECT username,
+                SUM(commits) as total_commits,
+                SUM(loc_commits) as with_loc,
+                SUM(additions) as total_additions,
+                SUM(deletions) as total_deletions,
+                COUNT(*) as active_days,
+                MIN(date) as first_commit,
+                MAX(date) as last_commit
+            FROM daily_rollup
+        '''
+        params = []
+        if usernames is not None:
+            query += f" WHERE username IN ({','.join(['?' for _ in usernames])})"
+            params = list(usernames)
+        rows = conn.execute(query + ' GROUP BY username', params).fetchall()
+        return {r['username']: {
+            **dict(r),
+            'net_loc_change': r['total_additions'] - r['total_deletions'],
+        } for r in rows}
+
+    def user_fingerprints(self, usernames: list) -> dict:
+        """Digest of each user's rollup totals and profile, keyed by username.
+
+        Everything a user's exported data is built from feeds daily_rollup or
+        the users row, so an unchanged digest means an unchanged export.
+        """
+        conn = self._get_read_conn()
+        placeholders = ','.join(['?' for _ in usernames])
+        rollup = {r[0]: tuple(r) for r in conn.execute(f'''
+            SELECT username, COUNT(*), SUM(commits), SUM(additions), SUM(deletions),
+                SUM(loc_commits), SUM(repo_count), MIN(date), MAX(date)
+            FROM daily_rollup WHERE username IN ({placeholders}) GROUP BY username
+        ''', usernames).fetchall()}
+        profiles = {r[0]: r[1] for r in conn.execute(
+            f'SELECT username, updated_at FROM users WHERE username IN ({placeholders})', usernames
+        ).fetchall()}
+        return {
+            username: hashlib.sha1(repr((rollup.get(username), profiles.get(username))).encode()).hexdigest()
+            for username in usernames
+        }
     
-    def save_commits(self, commits: list):
-        """Save commits in batch."""
+    def save_commits(self, commits: list) -> int:
+        """Save commits in one transaction.
+
+        Returns the number of commits inserted; the rest (already stored, or rows
+        missing a required field) are ignored.
+        """
         if not commits:
             return 0
-        
         conn = self._get_conn()
-        saved = 0
-        for commit in commits:
-            try:
-                conn.execute('''
-                    INSERT OR IGNORE INTO commits 
-                    (sha, username, date, repo, message, url, additions, deletions, fetched_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    commit.get('sha'),
-                    commit.get('username'),
-                    commit.get('date'),
-                    commit.get('repo'),
-                    commit.get('message'),
-                    commit.get('url'),
-                    commit.get('additions'),
-                    commit.get('deletions'),
-                    datetime.now().isoformat()
-                ))
-                saved += conn.total_changes
-            except:
-                pass
-        conn.commit()
-        conn.close()
+        with conn:
+            return self._insert_commits(conn, commits)
+
+    def save_sync_progress(self, commits: list, pages: list, months: list, watermarks: list = ()) -> int:
+        """Save synced commits with the checkpoints they complete, in one transaction.
+
+        pages are (username, start_date, end_date, page, total_count, found) search
+        pages whose commits are in this batch; months are (username, year, month)
+        tuples now fully fetched, whose page checkpoints are dropped; watermarks are
+        (username, committed_at) pairs, which only ever move forward. Returns the
+        number of commits inserted.
+        """
+        now = datetime.now().isoformat()
+        conn = self._get_conn()
+        with conn:
+            saved = self._insert_commits(conn, commits) if commits else 0
+            conn.executemany('''
+                INSERT OR REPLACE INTO sync_pages
+                (username, start_date, end_date, page, total_count, found, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(username, str(start_date), str(end_date), page, total, found, now)
+                  for username, start_date, end_date, page, total, found in pages])
+            self._mark_months_fetched(conn, months, now)
+            conn.executemany('''
+                INSERT INTO sync_watermarks (username, committed_at, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET
+                    committed_at = MAX(committed_at, excluded.committed_at), updated_at = excluded.updated_at
+            ''', [(username, committed_at, now) for username, committed_at in watermarks])
         return saved
-    
+
+    def get_sync_watermark(self, username: str) -> str:
+        """Latest committer timestamp (UTC, ISO 8601) synced for a user, or None."""
+        row = self._get_read_conn().execute(
+            'SELECT committed_at FROM sync_watermarks WHERE username = ?', (username,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_sync_pages(self, username: str, start_date, end_date) -> dict:
+        """Checkpointed search pages of a date window: {page: (total_count, found)}.
+
+        Pages fetched before the window was over are left out, since commits
+        made after them would have shifted the results.
+        """
+        rows = self._get_read_conn().execute('''
+            SELECT page, total_count, found FROM sync_pages
+            WHERE username = ? AND start_date = ? AND end_date = ? AND fetched_at >= date(end_date, '+1 day')
+        ''', (username, str(start_date), str(end_date))).fetchall()
+        return {r['page']: (r['total_count'], r['found']) for r in rows}
+
+    def _insert_commits(self, conn, commits: list) -> int:
+        """Insert commits in the caller's transaction, keeping the rollup in step.
+
+        LOC is stored only when both additions and deletions are known. The
+        search index follows through the commits_fts triggers.
+        """
+        now = datetime.now().isoformat()
+        before = conn.total_changes
+        conn.executemany('''
+            INSERT OR IGNORE INTO commits
+            (sha, username, date, repo, message, url, additions, deletions, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            commit.get('sha'),
+            commit.get('username'),
+            commit.get('date'),
+            commit.get('repo'),
+            commit.get('message'),
+            commit.get('url'),
+            *((commit['additions'], commit['deletions'])
+              if commit.get('additions') is not None and commit.get('deletions') is not None
+              else (None, None)),
+            now
+        ) for commit in commits])
+        saved = conn.total_changes - before
+        if saved:
+            self._refresh_daily_rollup(conn, {(c.get('username'), c.get('date')) for c in commits})
+            self._bump_generation(conn)
+        return saved
+
     def update_commit_loc(self, sha: str, additions: int, deletions: int):
         """Update LOC data for a commit."""
+        self.update_commit_locs([(sha, additions, deletions)])
+
+    def update_commit_locs(self, rows: list):
+        """Update LOC data for many commits in one transaction.
+
+        rows is a list of (sha, additions, deletions) tuples. Rows missing either
+        count are skipped, so LOC is always stored for both columns together.
+        """
+        rows = [row for row in rows if row[1] is not None and row[2] is not None]
+        if not rows:
+            return
+        shas = [sha for sha, _, _ in rows]
         conn = self._get_conn()
-        conn.execute('''
-            UPDATE commits SET additions = ?, deletions = ? WHERE sha = ?
-        ''', (additions, deletions, sha))
-        conn.commit()
-        conn.close()
-    
-    def get_commits_needing_loc(self, username: str, limit: int = 500) -> list:
-        """Get commits that need LOC data."""
+        with conn:
+            conn.executemany('''
+                UPDATE commits SET additions = ?, deletions = ? WHERE sha = ?
+            ''', [(additions, deletions, sha) for sha, additions, deletions in rows])
+            conn.executemany('DELETE FROM loc_queue WHERE sha = ?', [(sha,) for sha in shas])
+            days = set()
+            for i in range(0, len(shas), 500):
+                chunk = shas[i:i + 500]
+                days.update(tuple(r) for r in conn.execute(
+                    f'SELECT username, date FROM commits WHERE sha IN ({",".join("?" * len(chunk))})', chunk
+                ))
+            self._refresh_daily_rollup(conn, days)
+            self._bump_generation(conn)
+
+    def get_http_cache(self, key: str) -> dict:
+        """Get cached validators and body for a conditional request."""
+        conn = self._get_read_conn()
+        row = conn.execute('SELECT etag, last_modified, body FROM http_cache WHERE key = ?', (key,)).fetchone()
+        return dict(row) if row else None
+
+    def save_http_cache(self, key: str, etag: str, last_modified: str, body: str):
+        """Store validators and body of a response for later revalidation."""
         conn = self._get_conn()
-        rows = conn.execute('''
-            SELECT sha, url FROM commits 
-            WHERE username = ? AND additions IS NULL 
+        with conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO http_cache (key, etag, last_modified, body, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, etag, last_modified, body, datetime.now().isoformat()))
+
+    def submit_job(self, kind: str, params: dict) -> tuple:
+        """Queue a job unless an identical one is queued or running. Returns (job_id, created)."""
+        params = json.dumps(params, sort_keys=True)
+        conn = self._get_conn()
+        with conn:
+            # idx_jobs_active turns a duplicate into a no-op; the insert holds the
+            # write lock, so the active job found below can't finish in between
+            cur = conn.execute('''
+                INSERT OR IGNORE INTO jobs (kind, params, status, created_at)
+                VALUES (?, ?, 'queued', ?)
+            ''', (kind, params, datetime.now().isoformat()))
+            if cur.rowcount:
+                return cur.lastrowid, True
+            row = conn.execute('''
+                SELECT id FROM jobs WHERE kind = ? AND params = ? AND status IN ('queued', 'running')
+            ''', (kind, params)).fetchone()
+        return row[0], False
+
+    def claim_job(self) -> dict:
+        """Mark the oldest queued job running and return it, or None when none are queued."""
+        conn = self._get_conn()
+        while True:
+            row = conn.execute("SELECT id, kind, params FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            with conn:
+                claimed = conn.execute('''
+                    UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'
+                ''', (datetime.now().isoformat(), row['id'])).rowcount
+            if claimed:  # otherwise another worker got there first; try the next one
+                last_seq = conn.execute(
+                    'SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = ?', (row['id'],)
+                ).fetchone()[0]
+                return {'id': row['id'], 'kind': row['kind'], 'params': json.loads(row['params']),
+                        'last_seq': last_seq}
+
+    def add_job_event(self, job_id: int, seq: int, data: str):
+        """Append a JSON progress event to a job."""
+        conn = self._get_conn()
+        with conn:
+            conn.execute('INSERT INTO job_events (job_id, seq, data) VALUES (?, ?, ?)', (job_id, seq, data))
+
+    def finish_job(self, job_id: int, status: str):
+        """Record a job as complete or failed."""
+        conn = self._get_conn()
+        with conn:
+            conn.execute('UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?',
+                         (status, datetime.now().isoformat(), job_id))
+
+    def get_job(self, job_id: int) -> dict:
+        """A job's kind, params, status, timestamps and last event seq, or None."""
+        row = self._get_read_conn().execute('''
+            SELECT *, (SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = jobs.id) as last_seq
+            FROM jobs WHERE id = ?
+        ''', (job_id,)).fetchone()
+        return dict(row, params=json.loads(row['params'])) if row else None
+
+    def get_jobs(self, limit: int = 50) -> list:
+        """Most recent jobs first."""
+        rows = self._get_read_conn().execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [dict(r, params=json.loads(r['params'])) for r in rows]
+
+    def get_job_events(self, job_id: int, after: int = 0) -> list:
+        """(seq, JSON data) of a job's events after seq `after`, in order."""
+        return [tuple(r) for r in self._get_read_conn().execute(
+            'SELECT seq, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq', (job_id, after)
+        )]
+
+    def requeue_interrupted_jobs(self) -> int:
+        """Queue again the jobs a stopped server left running. Returns how many."""
+        conn = self._get_conn()
+        with conn:
+            return conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'").rowcount
+
+    def prune_jobs(self, days: int) -> int:
+        """Delete jobs finished more than `days` ago, with their events. Returns how many."""
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        conn = self._get_conn()
+        with conn:
+            conn.execute('''
+                DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE finished_at < ?)
+            ''', (cutoff,))
+            return conn.execute('DELETE FROM jobs WHERE finished_at < ?', (cutoff,)).rowcount
+
+    def refresh_loc_queue(self):
+        """Bring loc_queue in line with the commits missing LOC, and score new entries.
+
+        Commits added since the last refresh are scored and queued; the whole
+        queue is only rescored when the day changed, since that moves the
+        period windows. Commits leave the queue as their LOC is saved
+        (update_commit_locs), and retry state survives rescoring.
+        """
+        today = date.today()
+        conn = self._get_conn()
+        max_rowid = conn.execute('SELECT MAX(rowid) FROM commits').fetchone()[0] or 0
+        meta = dict(conn.execute(
+            "SELECT key, value FROM db_meta WHERE key IN ('loc_queue_day', 'loc_queue_rowid', 'loc_queue_top_repo')"
+        ).fetchall())
+        rescore = meta.get('loc_queue_day') != today.toordinal()
+        if not rescore and meta.get('loc_queue_rowid') == max_rowid:
+            return
+
+        windows = [(today - timedelta(days=days)).isoformat() for days in LOC_PRIORITY_WINDOWS]
+        windows.append(f'{today.year}-01-01')
+        with conn:
+            if rescore:
+                after = 0
+                top_repo = conn.execute(
+                    'SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM commits GROUP BY repo)'
+                ).fetchone()[0] or 1
+                conn.execute('DELETE FROM loc_queue WHERE sha IN (SELECT sha FROM commits WHERE additions IS NOT NULL)')
+            else:
+                # Only rows inserted since the last refresh, and repo sizes for their repos;
+                # a repo grown past the last rescore's largest scores as the largest until the next
+                after = meta.get('loc_queue_rowid') or 0
+                top_repo = meta.get('loc_queue_top_repo') or 1
+            # Each dashboard window a commit falls in is a headline number its LOC moves,
+            # so windows dominate; recency, then repo size, order the rest
+            conn.execute(f'''
+                INSERT OR REPLACE INTO loc_queue (sha, username, priority, attempts, next_attempt)
+                SELECT c.sha, c.username,
+                    10.0 * ({' + '.join(['(c.date >= ?)'] * len(windows))})
+                    + 5.0 * 365 / (365 + MAX(julianday(?) - julianday(c.date), 0))
+                    + 3.0 * MIN(COALESCE(rc.n, 0), ?) / ?,
+                    COALESCE(q.attempts, 0), q.next_attempt
+                FROM commits c
+                LEFT JOIN (
+                    SELECT repo, COUNT(*) AS n FROM commits
+                    WHERE ? = 0 OR repo IN (SELECT repo FROM commits WHERE rowid > ?)
+                    GROUP BY repo
+                ) rc ON rc.repo = c.repo
+                LEFT JOIN loc_queue q ON q.sha = c.sha
+                WHERE c.rowid > ? AND c.additions IS NULL
+            ''', windows + [today.isoformat(), top_repo, top_repo, after, after, after])
+            conn.executemany('INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)', [
+                ('loc_queue_day', today.toordinal()), ('loc_queue_rowid', max_rowid),
+                ('loc_queue_top_repo', top_repo),
+            ])
+
+    def get_commits_needing_loc(self, username: str = None, limit: int = 500) -> list:
+        """Highest-priority commits without LOC that aren't waiting out a retry backoff.
+
+        username None takes them from every user. Reads loc_queue as it stands;
+        writers call refresh_loc_queue first (iter_sync after saving, the LOC
+        fetchers before reading).
+        """
+        conn = self._get_read_conn()
+        rows = conn.execute(f'''
+            SELECT c.sha, c.url, c.repo FROM loc_queue q JOIN commits c ON c.sha = q.sha
+            WHERE {'q.username = ? AND' if username else ''}
+                (q.next_attempt IS NULL OR q.next_attempt <= datetime('now'))
+            ORDER BY q.priority DESC
             LIMIT ?
-        ''', (username, limit)).fetchall()
-        conn.close()
+        ''', (username, limit) if username else (limit,)).fetchall()
         return [dict(r) for r in rows]
-    
+
+    def defer_loc(self, shas: list):
+        """Back off commits GitHub has no stats for (deleted repos, unknown SHAs).
+
+        The first retry waits an hour and each later one four times longer, up to
+        LOC_RETRY_MAX_DAYS, so failures stop taking a place in every batch.
+        """
+        if not shas:
+            return
+        conn = self._get_conn()
+        with conn:
+            conn.executemany('''
+                UPDATE loc_queue SET attempts = attempts + 1,
+                    next_attempt = datetime('now', '+' || MIN(60 << (2 * MIN(attempts, 8)), ?) || ' minutes')
+                WHERE sha = ?
+            ''', [(LOC_RETRY_MAX_DAYS * 24 * 60, sha) for sha in shas])
+
     def mark_month_fetched(self, username: str, year: int, month: int):
         """Mark a month as fetched."""
+        self.mark_months_fetched([(username, year, month)])
+
+    def mark_months_fetched(self, months: list):
+        """Mark many (username, year, month) tuples as fetched in one transaction."""
+        if not months:
+            return
         conn = self._get_conn()
-        conn.execute('''
+        with conn:
+            self._mark_months_fetched(conn, months, datetime.now().isoformat())
+
+    def _mark_months_fetched(self, conn, months: list, now: str):
+        """Record months in fetch_meta and drop their page checkpoints, in the caller's transaction."""
+        conn.executemany('''
             INSERT OR REPLACE INTO fetch_meta (username, year_month, fetched_at)
             VALUES (?, ?, ?)
-        ''', (username, f'{year}-{month:02d}', datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
-    
+        ''', [(username, f'{year}-{month:02d}', now) for username, year, month in months])
+        # Every window of a month starts inside it; the current month is searched afresh next sync
+        conn.executemany('''
+            DELETE FROM sync_pages WHERE username = ? AND start_date >= ? AND start_date < ?
+        ''', [(username, date(year, month, 1).isoformat(),
+               (date(year, month, 1) + relativedelta(months=1)).isoformat())
+              for username, year, month in months])
+
+    def get_complete_months(self, username: str) -> set:
+        """'YYYY-MM' months last fetched after they had ended, so no commits can be missing."""
+        rows = self._get_read_conn().execute('''
+            SELECT year_month FROM fetch_meta
+            WHERE username = ? AND fetched_at >= date(year_month || '-01', '+1 month')
+        ''', (username,)).fetchall()
+        return {r[0] for r in rows}
+
     def is_month_fetched(self, username: str, year: int, month: int) -> bool:
         """Check if month is fetched."""
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         row = conn.execute('''
             SELECT 1 FROM fetch_meta WHERE username = ? AND year_month = ?
         ''', (username, f'{year}-{month:02d}')).fetchone()
-        conn.close()
         return row is not None
     
+    def get_commit_density(self, username: str, year: int, month: int) -> float:
+        """Expected commits per day in year/month, from stored commits.
+
+        The month's own commits when it has any (per day elapsed so far, for the
+        current month), otherwise the median of the months around it, so one busy
+        neighbour doesn't shrink the windows of a quiet month.
+        """
+        target = date(year, month, 1)
+        conn = self._get_read_conn()
+        rows = conn.execute('''
+            SELECT strftime('%Y-%m', date) as year_month, COUNT(*) as commits
+            FROM commits WHERE username = ? AND date >= ? AND date < ?
+            GROUP BY year_month
+        ''', (username, (target - relativedelta(months=3)).isoformat(),
+              (target + relativedelta(months=4)).isoformat())).fetchall()
+        month_key = f'{year}-{month:02d}'
+        counts = {r['year_month']: r['commits'] for r in rows}
+        if counts.get(month_key):
+            end = min(target + relativedelta(months=1), date.today() + timedelta(days=1))
+            return counts[month_key] / max(1, (end - target).days)
+        rates = [commits / 30.4 for year_month, commits in counts.items() if year_month != month_key]
+        return float(np.median(rates)) if rates else 0.0
+
     def get_stats(self, username: str) -> dict:
         """Get comprehensive stats for a user - the god-tier metrics."""
-        conn = self._get_conn()
-
-        # Basic counts
-        total = conn.execute('SELECT COUNT(*) FROM commits WHERE username = ?', (username,)).fetchone()[0]
-        with_loc = conn.execute('SELECT COUNT(*) FROM commits WHERE username = ? AND additions IS NOT NULL', (username,)).fetchone()[0]
-
-        # Totals
-        totals = conn.execute('''
-            SELECT
-                COALESCE(SUM(additions), 0) as total_additions,
-                COALESCE(SUM(deletions), 0) as total_deletions
-            FROM commits WHERE username = ?
-        ''', (username,)).fetchone()
-
-        # Date range
-        dates = conn.execute('''
-            SELECT MIN(date) as first, MAX(date) as last
-            FROM commits WHERE username = ?
-        ''', (username,)).fetchone()
-
-        # Active days (unique days with commits)
-        active_days = conn.execute('''
-            SELECT COUNT(DISTINCT date) FROM commits WHERE username = ?
-        ''', (username,)).fetchone()[0]
-
-        # Unique repos
-        unique_repos = conn.execute('''
-            SELECT COUNT(DISTINCT repo) FROM commits WHERE username = ?
-        ''', (username,)).fetchone()[0]
-
-        # Max commits in a day
-        max_day = conn.execute('''
-            SELECT date, COUNT(*) as cnt FROM commits
-            WHERE username = ? GROUP BY date ORDER BY cnt DESC LIMIT 1
-        ''', (username,)).fetchone()
-
-        # Day of week analysis
-        dow_stats = conn.execute('''
-            SELECT
-                CASE CAST(strftime('%w', date) AS INTEGER)
-                    WHEN 0 THEN 'Sunday'
-                    WHEN 1 THEN 'Monday'
-                    WHEN 2 THEN 'Tuesday'
-                    WHEN 3 THEN 'Wednesday'
-                    WHEN 4 THEN 'Thursday'
-                    WHEN 5 THEN 'Friday'
-                    WHEN 6 THEN 'Saturday'
-                END as day,
-                COUNT(*) as commits
-            FROM commits WHERE username = ?
-            GROUP BY strftime('%w', date) ORDER BY commits DESC
+        return self.get_stats_for([username])
+
+    def get_stats_for(self, usernames: list) -> dict:
+        """Get comprehensive stats across one or more users.
+
+        Merged from each user's cached stats partial, so the combined view
+        costs no queries once the per-user stats have been built.
+        """
+        return stats_from_partial(merge_stats_partials([self.stats_partial(u) for u in usernames]))
+
+    def stats_partial(self, username: str) -> dict:
+        """One user's mergeable stats aggregate, cached until the next write.
+
+        Two scans: daily_rollup gives the sorted active day ordinals ('days')
+        with a counter array per PARTIAL_DAY_FIELDS, and a repo -> last-commit
+        date map (index-only on commits) feeds the distinct repo counts. Any
+        set of users' partials merges exactly with merge_stats_partials.
+        """
+        generation = self.generation()
+        with self._partials_lock:
+            cached = self._partials.get(username)
+        if cached and cached[0] == generation:
+            return cached[1]
+
+        conn = self._get_read_conn()
+        daily = conn.execute('''
+            SELECT date, commits, loc_commits, additions, deletions
+            FROM daily_rollup WHERE username = ? ORDER BY date
         ''', (username,)).fetchall()
-
-        # Yearly breakdown
-        yearly = {}
-        yearly_rows = conn.execute('''
-            SELECT
-                strftime('%Y', date) as year,
-                COUNT(*) as commits,
-                COALESCE(SUM(additions), 0) as additions,
-                COALESCE(SUM(deletions), 0) as deletions,
-                COUNT(DISTINCT date) as days_active
-            FROM commits WHERE username = ?
-            GROUP BY strftime('%Y', date) ORDER BY year
-        ''', (username,)).fetchall()
-        for row in yearly_rows:
-            yearly[row['year']] = {
-                'commits': row['commits'],
-                'additions': row['additions'],
-                'deletions': row['deletions'],
-                'net_loc': row['additions'] - row['deletions'],
-                'days_active': row['days_active']
-            }
-
-        # Streak calculation
-        all_dates = [r[0] for r in conn.execute(
-            'SELECT DISTINCT date FROM commits WHERE username = ? ORDER BY date', (username,)
-        ).fetchall()]
-
-        current_streak = 0
-        longest_streak = 0
-        if all_dates:
-            today = datetime.now().strftime('%Y-%m-%d')
-            yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-
-            # Calculate current streak
-            if all_dates and (all_dates[-1] == today or all_dates[-1] == yesterday):
-                current_streak = 1
-                for i in range(len(all_dates) - 2, -1, -1):
-                    d1 = datetime.strptime(all_dates[i], '%Y-%m-%d')
-                    d2 = datetime.strptime(all_dates[i + 1], '%Y-%m-%d')
-                    if (d2 - d1).days == 1:
-                        current_streak += 1
-                    else:
-                        break
-
-            # Calculate longest streak
-            if all_dates:
-                streak = 1
-                for i in range(1, len(all_dates)):
-                    d1 = datetime.strptime(all_dates[i - 1], '%Y-%m-%d')
-                    d2 = datetime.strptime(all_dates[i], '%Y-%m-%d')
-                    if (d2 - d1).days == 1:
-                        streak += 1
-                    else:
-                        longest_streak = max(longest_streak, streak)
-                        streak = 1
-                longest_streak = max(longest_streak, streak)
-
-        # Average commit size
-        avg_loc = conn.execute('''
-            SELECT AVG(additions + deletions) FROM commits
-            WHERE username = ? AND additions IS NOT NULL
-        ''', (username,)).fetchone()[0] or 0
-
-        # Time period metrics
-        today = datetime.now()
-        year_start = datetime(today.year, 1, 1).strftime('%Y-%m-%d')
-
-        periods = {
-            '7d': (today - timedelta(days=7)).strftime('%Y-%m-%d'),
-            '30d': (today - timedelta(days=30)).strftime('%Y-%m-%d'),
-            '90d': (today - timedelta(days=90)).strftime('%Y-%m-%d'),
-            'ytd': year_start,
-            '1y': (today - timedelta(days=365)).strftime('%Y-%m-%d'),
-        }
-
-        period_stats = {}
-        for period, start_date in periods.items():
-            stats = conn.execute('''
-                SELECT
-                    COUNT(*) as commits,
-                    COALESCE(SUM(additions), 0) as additions,
-                    COALESCE(SUM(deletions), 0) as deletions,
-                    COUNT(DISTINCT date) as active_days,
-                    COUNT(DISTINCT repo) as repos
-                FROM commits WHERE username = ? AND date >= ?
-            ''', (username, start_date)).fetchone()
-            period_stats[period] = dict(stats)
-
-        # 30-day comparison for change calculation
-        thirty_days_ago = periods['30d']
-        sixty_days_ago = (today - timedelta(days=60)).strftime('%Y-%m-%d')
-
-        prev_30d = conn.execute('''
-            SELECT COALESCE(SUM(additions), 0) as adds, COALESCE(SUM(deletions), 0) as dels
-            FROM commits WHERE username = ? AND date >= ? AND date < ?
-        ''', (username, sixty_days_ago, thirty_days_ago)).fetchone()
-
-        # Calculate percentage change
-        additions_30d_change = 0
-        deletions_30d_change = 0
-        last_30d_adds = period_stats['30d']['additions']
-        last_30d_dels = period_stats['30d']['deletions']
-        if prev_30d['adds'] > 0:
-            additions_30d_change = round(((last_30d_adds - prev_30d['adds']) / prev_30d['adds']) * 100, 0)
-        elif last_30d_adds > 0:
-            additions_30d_change = 100
-        if prev_30d['dels'] > 0:
-            deletions_30d_change = round(((last_30d_dels - prev_30d['dels']) / prev_30d['dels']) * 100, 0)
-        elif last_30d_dels > 0:
-            deletions_30d_change = 100
-
-        conn.close()
-
-        # Calculate derived stats
-        first_date = datetime.strptime(dates['first'], '%Y-%m-%d') if dates['first'] else datetime.now()
-        last_date = datetime.strptime(dates['last'], '%Y-%m-%d') if dates['last'] else datetime.now()
-        total_days = (last_date - first_date).days + 1 if dates['first'] else 0
-        years_coding = (datetime.now() - first_date).days / 365.25 if dates['first'] else 0
-
-        return {
-            'total_commits': total,
-            'with_loc': with_loc,
-            'missing_loc': total - with_loc,
-            'total_additions': totals['total_additions'],
-            'total_deletions': totals['total_deletions'],
-            'net_loc_change': totals['total_additions'] - totals['total_deletions'],
-            'first_commit': dates['first'],
-            'last_commit': dates['last'],
-            'total_days': total_days,
-            'active_days': active_days,
-            'unique_repos': unique_repos,
-            'years_coding': round(years_coding, 1),
-            'average_commits': round(total / max(active_days, 1), 1),
-            'average_loc_per_commit': round(avg_loc, 0),
-            'maximum_commits': max_day['cnt'] if max_day else 0,
-            'max_commit_date': max_day['date'] if max_day else None,
-            'current_streak': current_streak,
-            'longest_streak': longest_streak,
-            'most_productive_day': dow_stats[0]['day'] if dow_stats else None,
-            'day_of_week_stats': {r['day']: r['commits'] for r in dow_stats},
-            'yearly': yearly,
-            # Time period metrics
-            'periods': period_stats,
-            'additions_30d_change': additions_30d_change,
-            'deletions_30d_change': deletions_30d_change,
-        }
+        columns = list(zip(*daily, strict=True)) or [[]] * 5
+        partial = {'days': np.array(columns[0], dtype='datetime64[D]').astype(np.int64)}
+        for field, values in zip(PARTIAL_DAY_FIELDS, columns[1:], strict=True):
+            partial[field] = np.array(values, dtype=np.int64)
+        partial['repo_last'] = dict(conn.execute('''
+            SELECT repo, MAX(date) FROM commits
+            WHERE username = ? AND repo IS NOT NULL
+            GROUP BY repo
+        ''', (username,)).fetchall())
+        # Labelled with the generation read before the scans: a write in between
+        # only makes the next lookup rebuild it
+        with self._partials_lock:
+            self._partials[username] = (generation, partial)
+        return partial
     
     def get_daily_stats(self, username: str, since: str = None) -> list:
         """Get daily commit stats."""
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         query = '''
-            SELECT 
-                date,
-                COUNT(*) as commits,
-                COALESCE(SUM(additions), 0) as additions,
-                COALESCE(SUM(deletions), 0) as deletions,
-                COUNT(DISTINCT repo) as repos
-            FROM commits 
+            SELECT date, commits, additions, deletions, repo_count as repos
+            FROM daily_rollup
             WHERE username = ?
         '''
         params = [username]
         if since:
             query += ' AND date >= ?'
             params.append(since)
-        query += ' GROUP BY date ORDER BY date'
+        query += ' ORDER BY date'
         
         rows = conn.execute(query, params).fetchall()
-        conn.close()
         return [dict(r) for r in rows]
     
     def get_yearly_stats(self, username: str) -> list:
         """Get yearly aggregated stats."""
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         rows = conn.execute('''
             SELECT 
                 strftime('%Y', date) as year,
-                COUNT(*) as commits,
-                COALESCE(SUM(additions), 0) as additions,
-                COALESCE(SUM(deletions), 0) as deletions,
-                COUNT(DISTINCT repo) as repos,
-                COUNT(DISTINCT date) as days_active
-            FROM commits 
+                SUM(commits) as commits,
+                SUM(additions) as additions,
+                SUM(deletions) as deletions,
+                COUNT(*) as days_active
+            FROM daily_rollup 
             WHERE username = ?
             GROUP BY year
             ORDER BY year DESC
         ''', (username,)).fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+        # Distinct repos don't add up across days; this scan is index-only
+        repos = dict(conn.execute('''
+            SELECT strftime('%Y', date) as year, COUNT(DISTINCT repo)
+            FROM commits WHERE username = ?
+            GROUP BY year
+        ''', (username,)).fetchall())
+        return [{
+            'year': r['year'],
+            'commits': r['commits'],
+            'additions': r['additions'],
+            'deletions': r['deletions'],
+            'repos': repos.get(r['year'], 0),
+            'days_active': r['days_active'],
+        } for r in rows]
     
     def get_top_repos(self, username: str, limit: int = 20, order_by: str = 'commits') -> list:
         """Get top repositories by commits or LOC."""
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         order_col = 'commits' if order_by == 'commits' else 'additions'
         rows = conn.execute(f'''
             SELECT 
@@ -546,30 +1449,28 @@ class StatsDB:
             ORDER BY {order_col} DESC
             LIMIT ?
         ''', (username, limit)).fetchall()
-        conn.close()
         return [dict(r) for r in rows]
     
     def get_monthly_stats(self, username: str) -> list:
         """Get monthly aggregated stats for heatmap."""
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         rows = conn.execute('''
             SELECT 
                 strftime('%Y', date) as year,
                 strftime('%m', date) as month,
-                COUNT(*) as commits,
-                COALESCE(SUM(additions), 0) as additions,
-                COALESCE(SUM(deletions), 0) as deletions
-            FROM commits 
+                SUM(commits) as commits,
+                SUM(additions) as additions,
+                SUM(deletions) as deletions
+            FROM daily_rollup 
             WHERE username = ?
             GROUP BY year, month
             ORDER BY year, month
         ''', (username,)).fetchall()
-        conn.close()
         return [dict(r) for r in rows]
     
     def get_recent_commits(self, username: str, limit: int = 50) -> list:
         """Get recent commits."""
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         rows = conn.execute('''
             SELECT sha, date, repo, message, additions, deletions
             FROM commits 
@@ -577,113 +1478,305 @@ class StatsDB:
             ORDER BY date DESC
             LIMIT ?
         ''', (username, limit)).fetchall()
-        conn.close()
         return [dict(r) for r in rows]
     
     def search_commits(self, username: str, query: str, limit: int = 100) -> list:
-        """Search commits by message or repo."""
-        conn = self._get_conn()
-        rows = conn.execute('''
-            SELECT sha, date, repo, message, additions, deletions
-            FROM commits 
-            WHERE username = ? AND (message LIKE ? OR repo LIKE ?)
-            ORDER BY date DESC
+        """Search commits by message or repo name, best matches first.
+
+        Words match as prefixes (see fts_query) and results are ranked by BM25,
+        with repo name hits weighted above message hits. Each result has a
+        plain-text `snippet` of its message and the [start, end) offsets of the
+        matches in it as `highlights`; clients escape the text before marking
+        them up. username None searches every user. Without FTS5 this falls
+        back to a substring scan, newest first.
+        """
+        conn = self._get_read_conn()
+        user_filter = 'AND c.username = ?' if username else ''
+        params = [username] if username else []
+        if not self.fts:
+            rows = conn.execute(f'''
+                SELECT sha, date, repo, message, additions, deletions, message AS snippet
+                FROM commits c
+                WHERE (message LIKE ? OR repo LIKE ?) {user_filter}
+                ORDER BY date DESC
+                LIMIT ?
+            ''', [f'%{query}%', f'%{query}%', *params, limit]).fetchall()
+            results = [dict(r) for r in rows]
+            needle = query.lower()
+            for result in results:
+                at = (result['snippet'] or '').lower().find(needle) if needle else -1
+                result['highlights'] = [[at, at + len(needle)]] if at >= 0 else []
+            return results
+
+        match = fts_query(query)
+        if not match:
+            return []
+        rows = conn.execute(f'''
+            SELECT c.sha, c.date, c.repo, c.message, c.additions, c.deletions,
+                snippet(commits_fts, 0, ?, ?, '…', 16) AS snippet
+            FROM commits_fts JOIN commits c ON c.rowid = commits_fts.rowid
+            WHERE commits_fts MATCH ? {user_filter}
+            ORDER BY bm25(commits_fts, 1.0, 2.0)
             LIMIT ?
-        ''', (username, f'%{query}%', f'%{query}%', limit)).fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+        ''', [*SNIPPET_MARKS, match, *params, limit]).fetchall()
+        results = [dict(r) for r in rows]
+        for result in results:
+            result['snippet'], result['highlights'] = split_snippet(result['snippet'] or '')
+        return results
+
+
+class RateLimiter:
+    """Token-bucket scheduler for GitHub's separate rate limit pools.
+
+    Each pool starts from GitHub's documented budget and is resynced from the
+    X-RateLimit-* and Retry-After headers of every response, so fetchers run at
+    the highest rate the server currently allows instead of a fixed delay.
+    """
+
+    # pool -> (requests, window seconds)
+    POOLS = {'core': (5000, 3600), 'search': (30, 60), 'graphql': (5000, 3600)}
+
+    def __init__(self, pools: dict = None):
+        self.lock = threading.Lock()
+        now = time.time()
+        self.buckets = {
+            name: {'limit': limit, 'window': window, 'tokens': float(limit),
+                   'updated': now, 'blocked_until': 0.0}
+            for name, (limit, window) in (pools or self.POOLS).items()
+        }
+
+    @staticmethod
+    def pool_for(url: str) -> str:
+        """Rate limit pool a GitHub API URL is billed against."""
+        if url == GRAPHQL_URL:
+            return 'graphql'
+        return 'search' if '/search/' in url else 'core'
+
+    def acquire(self, pool: str):
+        """Block until a request may be sent from pool."""
+        while True:
+            with self.lock:
+                bucket = self.buckets[pool]
+                now = time.time()
+                rate = bucket['limit'] / bucket['window']
+                bucket['tokens'] = min(bucket['tokens'] + (now - bucket['updated']) * rate, bucket['limit'])
+                bucket['updated'] = now
+                if now >= bucket['blocked_until'] and bucket['tokens'] >= 1:
+                    bucket['tokens'] -= 1
+                    return
+                wait = max(bucket['blocked_until'] - now, (1 - bucket['tokens']) / rate)
+            time.sleep(wait)
+
+    def update(self, pool: str, resp) -> bool:
+        """Resync pool from resp's headers.
+
+        Returns True if resp was rate limited and the request should be retried.
+        """
+        headers = resp.headers
+        now = time.time()
+        with self.lock:
+            bucket = self.buckets[pool]
+            remaining = headers.get('X-RateLimit-Remaining')
+            if remaining is not None:
+                bucket['limit'] = int(headers.get('X-RateLimit-Limit', bucket['limit']))
+                bucket['tokens'] = float(remaining)
+                bucket['updated'] = now
+                if int(remaining) == 0:
+                    reset = float(headers.get('X-RateLimit-Reset', now + bucket['window']))
+                    bucket['blocked_until'] = max(bucket['blocked_until'], reset)
+
+            if resp.status_code not in (403, 429):
+                return False
+
+            retry_after = headers.get('Retry-After')
+            if retry_after:
+                bucket['blocked_until'] = max(bucket['blocked_until'], now + int(retry_after))
+            elif remaining == '0':
+                pass  # Already blocked until the reset above
+            elif 'rate limit' in resp.text.lower():
+                # Secondary limit without Retry-After: GitHub asks for at least a minute
+                bucket['blocked_until'] = max(bucket['blocked_until'], now + 60)
+            else:
+                return False  # Plain permission error, not a rate limit
+
+            print(f'    Rate limited ({pool}), waiting {bucket["blocked_until"] - now:.0f}s...')
+            return True
+
+
+RATE_LIMITER = RateLimiter()
 
 
 class GitHubAPI:
     """GitHub API client."""
-    
+
+    # StatsDB holding the ETag/Last-Modified store, set by GitHubStatsAnalyzer
+    cache = None
+
+    @classmethod
+    def request(cls, method: str, url: str, headers: dict = REST_HEADERS, retries: int = 3, **kwargs):
+        """Send through the shared session and rate limiter, retrying after rate limits."""
+        pool = RateLimiter.pool_for(url)
+        kwargs.setdefault('timeout', 30)
+        for _ in range(retries):
+            RATE_LIMITER.acquire(pool)
+            resp = HTTP.request(method, url, headers=headers, **kwargs)
+            if not RATE_LIMITER.update(pool, resp):
+                break
+        return resp
+
+    @classmethod
+    def get(cls, url: str, headers: dict = REST_HEADERS, params: dict = None, timeout: int = 30):
+        """GET through the shared session and rate limiter."""
+        return cls.request('GET', url, headers=headers, params=params, timeout=timeout)
+
+    @classmethod
+    def get_json(cls, url: str, headers: dict = REST_HEADERS, params: dict = None,
+                 timeout: int = 30) -> tuple:
+        """GET a JSON resource, revalidating any cached copy with If-None-Match.
+
+        Returns (status_code, data). A 304 is answered from the cache as a 200; GitHub
+        does not count 304 responses against the rate limit.
+        """
+        key = f"{headers.get('Accept', '')} {requests.Request('GET', url, params=params).prepare().url}"
+        cached = cls.cache.get_http_cache(key) if cls.cache else None
+        if cached:
+            headers = dict(headers)
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        resp = cls.get(url, headers=headers, params=params, timeout=timeout)
+        if resp.status_code == 304 and cached:
+            return 200, json.loads(cached['body'])
+        if resp.status_code != 200:
+            return resp.status_code, None
+
+        etag, last_modified = resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+        if cls.cache and (etag or last_modified):
+            cls.cache.save_http_cache(key, etag, last_modified, resp.text)
+        return 200, resp.json()
+
     @staticmethod
     def get_user_profile(username: str) -> dict:
         """Fetch user profile from GitHub."""
         try:
-            resp = requests.get(f'https://api.github.com/users/{username}', 
-                              headers=REST_HEADERS, timeout=30)
-            if resp.status_code == 200:
-                return resp.json()
+            status, data = GitHubAPI.get_json(f'https://api.github.com/users/{username}')
+            if status == 200:
+                return data
         except:
             pass
         return None
     
     @staticmethod
-    def search_commits(username: str, start_date, end_date) -> tuple:
-        """Search for commits by author in a date range."""
-        commits = []
-        page = 1
+    def search_commits_page(username: str, start_date, end_date, page: int = 1) -> tuple:
+        """Fetch one page of commits by author in a date range.
+
+        Either bound may also be an ISO 8601 timestamp, or '*' for open-ended.
+        Returns (commits, total_count); total_count is None if the request failed.
+        """
         query = f'author:{username} committer-date:{start_date}..{end_date}'
-        
-        while page <= 10:
-            url = 'https://api.github.com/search/commits'
-            params = {'q': query, 'per_page': 100, 'page': page, 'sort': 'committer-date'}
-            
-            try:
-                resp = requests.get(url, headers=SEARCH_HEADERS, params=params, timeout=30)
-                
-                if resp.status_code == 403:
-                    reset_time = int(resp.headers.get('X-RateLimit-Reset', 0))
-                    wait_time = max(reset_time - time.time(), 60)
-                    print(f'    Rate limited, waiting {wait_time:.0f}s...')
-                    time.sleep(wait_time)
-                    continue
-                
-                if resp.status_code != 200:
-                    break
-                
-                data = resp.json()
-                items = data.get('items', [])
-                
-                if not items:
-                    break
-                
-                for item in items:
-                    commit_obj = item.get('commit', {})
-                    committer = commit_obj.get('committer', {})
-                    
-                    commits.append({
-                        'sha': item.get('sha', ''),
-                        'username': username,
-                        'date': committer.get('date', '')[:10],
-                        'repo': item.get('repository', {}).get('full_name', ''),
-                        'message': commit_obj.get('message', '').split('\n')[0][:200],
-                        'url': item.get('url', ''),
-                        'additions': None,
-                        'deletions': None
-                    })
-                
-                if len(items) < 100:
-                    break
-                
-                page += 1
-                time.sleep(REQUEST_DELAY * 2)
-            
-            except Exception as e:
-                print(f'    Search error: {e}')
-                break
-        
-        return commits, len(commits) >= 1000
-    
+        params = {'q': query, 'per_page': SEARCH_PAGE_SIZE, 'page': page, 'sort': 'committer-date'}
+
+        try:
+            resp = GitHubAPI.get('https://api.github.com/search/commits', headers=SEARCH_HEADERS, params=params)
+            if resp.status_code != 200:
+                return [], None
+            data = resp.json()
+        except Exception as e:
+            print(f'    Search error: {e}')
+            return [], None
+
+        commits = []
+        for item in data.get('items', []):
+            commit_obj = item.get('commit', {})
+            committer = commit_obj.get('committer', {})
+
+            commits.append({
+                'sha': item.get('sha', ''),
+                'username': username,
+                'date': committer.get('date', '')[:10],
+                'committed_at': utc_timestamp(committer.get('date')),
+                'repo': item.get('repository', {}).get('full_name', ''),
+                'message': commit_obj.get('message', '').split('\n')[0][:200],
+                'url': item.get('url', ''),
+                'additions': None,
+                'deletions': None
+            })
+        return commits, data.get('total_count', 0)
+
     @staticmethod
     def get_commit_stats(url: str) -> tuple:
-        """Fetch LOC stats for a commit."""
+        """Fetch LOC stats for a commit.
+
+        Returns (additions, deletions), (None, None) if the request failed, or
+        None if GitHub has no such commit (404 or 422: deleted repo, unknown SHA).
+        """
         try:
-            resp = requests.get(url, headers=REST_HEADERS, timeout=30)
+            resp = GitHubAPI.get(url)
             if resp.status_code == 200:
                 stats = resp.json().get('stats', {})
                 return stats.get('additions', 0), stats.get('deletions', 0)
+            if resp.status_code in (404, 422):
+                return None
         except:
             pass
         return None, None
 
+    @staticmethod
+    def get_commit_stats_batch(commits: list) -> dict:
+        """Fetch LOC stats for many commits, across repos, in one GraphQL query.
+
+        Returns {sha: (additions, deletions)} for the commits GitHub resolved; commits
+        in missing or inaccessible repos are simply absent.
+        """
+        by_repo = defaultdict(list)
+        for commit in commits:
+            if commit.get('repo') and '/' in commit['repo']:
+                by_repo[commit['repo']].append(commit['sha'])
+        if not by_repo:
+            return {}
+
+        aliases = {}
+        fields = []
+        for i, (repo, shas) in enumerate(by_repo.items()):
+            owner, name = repo.split('/', 1)
+            objects = []
+            for j, sha in enumerate(shas):
+                aliases[(f'r{i}', f'c{j}')] = sha
+                objects.append(f'c{j}: object(oid: {json.dumps(sha)}) {{ ... on Commit {{ additions deletions }} }}')
+            fields.append(f'r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ {" ".join(objects)} }}')
+
+        try:
+            resp = GitHubAPI.request('POST', GRAPHQL_URL, headers=HEADERS,
+                                     json={'query': '{ ' + ' '.join(fields) + ' }'})
+            if resp.status_code != 200:
+                return {}
+            # Partial errors (deleted repos, unknown SHAs) still come back with data
+            data = resp.json().get('data') or {}
+        except (requests.RequestException, KeyError, ValueError) as e:
+            print(f'    GraphQL LOC error: {e}')
+            return {}
+
+        results = {}
+        for (repo_alias, commit_alias), sha in aliases.items():
+            obj = (data.get(repo_alias) or {}).get(commit_alias)
+            if obj and obj.get('additions') is not None:
+                results[sha] = (obj['additions'], obj['deletions'])
+        return results
+
+    @staticmethod
+    def commit_url(commit: dict) -> str:
+        """API URL for a commit row, built from repo/sha when url is missing."""
+        return commit.get('url') or f'https://api.github.com/repos/{commit["repo"]}/commits/{commit["sha"]}'
+
 
 class GitHubStatsAnalyzer:
     """Main analyzer class."""
     
     def __init__(self):
         self.db = StatsDB()
+        GitHubAPI.cache = self.db
     
     def fetch_user_profile(self, username: str):
         """Fetch and cache user profile."""
@@ -693,139 +1786,332 @@ class GitHubStatsAnalyzer:
             print(f'  Fetched profile for {username}')
         return profile
     
-    def fetch_commits_for_month(self, username: str, year: int, month: int) -> list:
-        """Fetch commits for a specific month."""
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1) - timedelta(days=1)
+    def fetch_commits_for_range(self, username: str, start_date, end_date, save_page) -> int:
+        """Fetch commits in a date range, splitting it while it exceeds the search cap.
+
+        The first page's total_count decides how many pieces the range needs before
+        any further pages are downloaded, so busy ranges are never fetched twice.
+        Each page is handed to save_page(start_date, end_date, page, total_count,
+        commits) to be saved with its checkpoint, and pages checkpointed by an
+        earlier, interrupted sync are skipped. Returns the commits found.
+        """
+        done = self.db.get_sync_pages(username, start_date, end_date)
+        if 1 in done:
+            total = done[1][0]
         else:
-            end_date = date(year, month + 1, 1) - timedelta(days=1)
-        
-        commits, hit_limit = GitHubAPI.search_commits(username, start_date, end_date)
-        
-        if hit_limit:
-            print(f'    Hit 1000 limit, splitting into weeks...')
-            commits = []
-            week_start = start_date
-            
-            while week_start <= end_date:
-                week_end = min(week_start + timedelta(days=6), end_date)
-                week_commits, week_hit = GitHubAPI.search_commits(username, week_start, week_end)
-                
-                if week_hit:
-                    print(f'    Week {week_start} hit limit, splitting into days...')
-                    for day_offset in range(7):
-                        day = week_start + timedelta(days=day_offset)
-                        if day > end_date:
-                            break
-                        day_commits, _ = GitHubAPI.search_commits(username, day, day)
-                        commits.extend(day_commits)
-                        time.sleep(REQUEST_DELAY)
-                else:
-                    commits.extend(week_commits)
-                
-                week_start = week_end + timedelta(days=1)
-                time.sleep(REQUEST_DELAY)
-        
-        return commits
-    
-    def fetch_all_commits(self, username: str, since_date=None):
-        """Fetch all commits for a user."""
+            commits, total = self._search_page(username, start_date, end_date, 1)
+            save_page(start_date, end_date, 1, total, commits)
+            done[1] = (total, len(commits))
+        days = (end_date - start_date).days + 1
+
+        if total > SEARCH_RESULT_CAP and days > 1:
+            # Aim each piece at ~80% of the cap so uneven days rarely need another split
+            pieces = min(days, max(2, -(-total // int(SEARCH_RESULT_CAP * 0.8))))
+            print(f'    {start_date}..{end_date} has {total} commits, splitting into {pieces} ranges...')
+            return sum(self.fetch_commits_for_range(username, piece_start, piece_end, save_page)
+                       for piece_start, piece_end in split_date_range(start_date, end_date, pieces))
+
+        if total > SEARCH_RESULT_CAP:
+            print(f'    {start_date} has {total} commits, only the first {SEARCH_RESULT_CAP} are searchable')
+        found = sum(page_found for _, page_found in done.values())
+        for page in range(2, -(-min(total, SEARCH_RESULT_CAP) // SEARCH_PAGE_SIZE) + 1):
+            if page in done:
+                continue
+            commits, _ = self._search_page(username, start_date, end_date, page)
+            if not commits:
+                break
+            save_page(start_date, end_date, page, total, commits)
+            found += len(commits)
+        return found
+
+    @staticmethod
+    def _search_page(username: str, start_date, end_date, page: int) -> tuple:
+        """search_commits_page, raising on a failed request so the page is retried, not skipped."""
+        commits, total = GitHubAPI.search_commits_page(username, start_date, end_date, page)
+        if total is None:
+            raise RuntimeError(f'commit search failed for {start_date}..{end_date} page {page}')
+        return commits, total
+
+    def fetch_commits_for_month(self, username: str, year: int, month: int, save_page) -> int:
+        """Fetch commits for a specific month, handing each search page to save_page.
+
+        The starting window size comes from the user's commit density in this or
+        nearby months, so heavy committers start with windows that fit under the
+        search cap; any range still over it is split by its total_count.
+        Returns the commits found.
+        """
+        start_date = date(year, month, 1)
+        end_date = start_date + relativedelta(months=1) - timedelta(days=1)
+        days = (end_date - start_date).days + 1
+
+        density = self.db.get_commit_density(username, year, month)
+        window = days
+        if density:
+            window = max(1, min(days, int(SEARCH_RESULT_CAP * 0.8 / density)))
+        if window < days:
+            print(f'    ~{density:.0f} commits/day, searching {window}-day windows')
+
+        return sum(self.fetch_commits_for_range(username, window_start, window_end, save_page)
+                   for window_start, window_end in split_date_range(start_date, end_date, -(-days // window)))
+
+    def fetch_commits_since(self, username: str, since: str, save_commits) -> int:
+        """Fetch commits with a committer date from `since` (UTC, ISO 8601) on.
+
+        Each page goes to save_commits(commits). Returns the commits found, or None,
+        after just one request, when more than SEARCH_RESULT_CAP match.
+        """
+        commits, total = self._search_page(username, since, '*', 1)
+        if total > SEARCH_RESULT_CAP:
+            return None
+        save_commits(commits)
+        found = len(commits)
+        for page in range(2, -(-total // SEARCH_PAGE_SIZE) + 1):
+            commits, _ = self._search_page(username, since, '*', page)
+            if not commits:
+                break
+            save_commits(commits)
+            found += len(commits)
+        return found
+
+    def months_to_fetch(self, username: str, since_date=None) -> list:
+        """(year, month) pairs not completely fetched for a user, always including the current month.
+
+        A month only counts as complete once it was fetched after it ended, so each
+        month gets one last full pass, catching commits pushed later than
+        incremental syncs of it had already searched.
+        """
         if since_date is None:
             since_date = START_DATE
-        
-        # Fetch profile first
-        if not self.db.get_user(username):
-            self.fetch_user_profile(username)
-        
+
         end_date = datetime.now().date()
-        current = since_date
-        months_to_fetch = []
-        
+        complete = self.db.get_complete_months(username)
+        current = date(since_date.year, since_date.month, 1)
+        months = []
+
         while current <= end_date:
-            year, month = current.year, current.month
-            if not self.db.is_month_fetched(username, year, month) or \
-               (year == end_date.year and month == end_date.month):
-                months_to_fetch.append((year, month))
-            
-            if month == 12:
-                current = date(year + 1, 1, 1)
-            else:
-                current = date(year, month + 1, 1)
-        
-        print(f'  {len(months_to_fetch)} months to fetch')
-        
-        for year, month in months_to_fetch:
-            print(f'  Fetching {year}-{month:02d}...')
-            commits = self.fetch_commits_for_month(username, year, month)
-            print(f'    Found {len(commits)} commits')
-            
-            saved = self.db.save_commits(commits)
-            print(f'    Saved {saved} new commits')
-            
-            self.db.mark_month_fetched(username, year, month)
-            time.sleep(REQUEST_DELAY)
-    
-    def fetch_loc_batch(self, username: str, batch_size: int = 500) -> int:
+            if f'{current.year}-{current.month:02d}' not in complete:
+                months.append((current.year, current.month))
+            current += relativedelta(months=1)
+
+        return months
+
+    def iter_sync(self, usernames: list, since_date=None, workers: int = SYNC_WORKERS, batch_size: int = 2000,
+                  incremental: bool = True):
+        """Fetch missing months for several users concurrently.
+
+        Month windows for every user run on one worker pool, paced by RATE_LIMITER,
+        while a single writer thread batches each search page's commits, with its
+        checkpoint in sync_pages, into commits and fetch_meta. An interrupted sync
+        resumes at the first page that wasn't saved.
+
+        With incremental, a user's current month is searched only from their sync
+        watermark (less SYNC_OVERLAP_MINUTES) on, usually a single request, and
+        the whole month only when there is no watermark or too much is new.
+        Yields (username, year, month, commits_found) as each month completes.
+        """
+        for username in usernames:
+            if not self.db.get_user(username):
+                self.fetch_user_profile(username)
+
+        tasks = [(username, year, month) for username in usernames
+                 for year, month in self.months_to_fetch(username, since_date)]
+        print(f'  {len(tasks)} months to fetch for {len(usernames)} users')
+
+        today = datetime.now().date()
+        results = queue.Queue()
+
+        def fetch_month(task):
+            """Fetch one month; returns (commits found, latest committed_at seen)."""
+            username, year, month = task
+            latest = ''
+
+            def save_commits(commits, page=None):
+                nonlocal latest
+                latest = max([latest] + [c['committed_at'] for c in commits if c.get('committed_at')])
+                results.put((commits, page, None, None))
+
+            def save_page(start_date, end_date, page, total, commits):
+                save_commits(commits, (username, start_date, end_date, page, total, len(commits)))
+
+            found = None
+            watermark = self.db.get_sync_watermark(username)
+            if incremental and watermark and (year, month) == (today.year, today.month):
+                month_start = datetime(year, month, 1, tzinfo=timezone.utc)
+                since = max(datetime.fromisoformat(watermark) - timedelta(minutes=SYNC_OVERLAP_MINUTES), month_start)
+                found = self.fetch_commits_since(username, utc_timestamp(since), save_commits)
+                if found is None:
+                    print(f'    Over {SEARCH_RESULT_CAP} new commits for {username}, searching the whole month')
+            if found is None:
+                found = self.fetch_commits_for_month(username, year, month, save_page)
+            return found, latest
+
+        writer = threading.Thread(target=self._write_sync_results, args=(results, batch_size), daemon=True)
+        writer.start()
+        try:
+            for (username, year, month), result, error in iter_concurrent(fetch_month, tasks, workers):
+                if error:
+                    print(f'  Error fetching {username} {year}-{month:02d}: {error}')
+                    continue
+                found, latest = result
+                # Only the current month moves the watermark: everything before it is fetched too
+                watermark = (username, latest) if latest and (year, month) == (today.year, today.month) else None
+                # Queued after all of the month's pages, so it is never marked before they are saved
+                results.put(([], None, (username, year, month), watermark))
+                yield username, year, month, found
+        finally:
+            results.put(None)
+            writer.join()
+            # Score the new commits for LOC backfill while this is the writing process anyway
+            self.db.refresh_loc_queue()
+
+    def _write_sync_results(self, results: queue.Queue, batch_size: int):
+        """Writer thread for iter_sync: batch pages and months into one save per transaction.
+
+        Items are (commits, page checkpoint, completed month, watermark), the last
+        three each possibly None. Months are only marked fetched, and watermarks
+        moved, after their commits are saved.
+        """
+        done = False
+        while not done:
+            item = results.get()
+            batch = []
+            pages = []
+            months = []
+            watermarks = []
+            while item is not None:
+                commits, page, month, watermark = item
+                batch.extend(commits)
+                if page:
+                    pages.append(page)
+                if month:
+                    months.append(month)
+                if watermark:
+                    watermarks.append(watermark)
+                if len(batch) >= batch_size:
+                    break
+                try:
+                    item = results.get_nowait()
+                except queue.Empty:
+                    break
+            done = item is None
+
+            if batch or pages or months:
+                saved = self.db.save_sync_progress(batch, pages, months, watermarks)
+                print(f'    Saved {saved} new commits from {len(pages)} pages, {len(months)} months complete')
+
+    def sync_users(self, usernames: list, since_date=None, workers: int = SYNC_WORKERS,
+                   incremental: bool = True) -> dict:
+        """Fetch all missing commits for several users. Returns {username: commits found}."""
+        found = defaultdict(int)
+        for username, year, month, count in self.iter_sync(usernames, since_date, workers, incremental=incremental):
+            print(f'  {username} {year}-{month:02d}: {count} commits')
+            found[username] += count
+        return dict(found)
+
+    def fetch_all_commits(self, username: str, since_date=None):
+        """Fetch all commits for a user."""
+        return self.sync_users([username], since_date).get(username, 0)
+
+    @staticmethod
+    def _fetch_loc_chunk(commits: list) -> list:
+        """Fetch LOC for a chunk of commits: one GraphQL query, REST for the misses.
+
+        Returns (commit, additions, deletions, gone) tuples; gone is True only
+        when GitHub positively has no such commit.
+        """
+        batch = GitHubAPI.get_commit_stats_batch(commits) if LOC_BACKEND == 'graphql' else {}
+        results = []
+        for commit in commits:
+            stats = batch.get(commit['sha']) or GitHubAPI.get_commit_stats(GitHubAPI.commit_url(commit))
+            results.append((commit, *(stats or (None, None)), stats is None))
+        return results
+
+    def iter_loc_stats(self, commits: list, workers: int = LOC_WORKERS, write_every: int = 100):
+        """Fetch LOC stats for commits concurrently.
+
+        Keeps up to `workers` requests in flight and yields (commit, additions, deletions)
+        as each one completes (additions is None on failure). With the GraphQL backend each
+        request covers GRAPHQL_BATCH_SIZE commits. Results are written to the database in
+        batched transactions of `write_every` rows. Commits GitHub answered 404 or 422 for
+        are backed off in loc_queue; other failures (network errors, 5xx, rate limits) are
+        left as they were, to be retried with the next batch.
+        """
+        chunk_size = GRAPHQL_BATCH_SIZE if LOC_BACKEND == 'graphql' else 1
+        chunks = [commits[i:i + chunk_size] for i in range(0, len(commits), chunk_size)]
+        pending = []
+        gone = []
+        try:
+            for chunk, results, error in iter_concurrent(self._fetch_loc_chunk, chunks, workers):
+                if error:
+                    print(f'    LOC fetch error: {error}')
+                    results = [(commit, None, None, False) for commit in chunk]
+                for commit, additions, deletions, missing in results:
+                    if additions is not None:
+                        pending.append((commit['sha'], additions, deletions))
+                        if len(pending) >= write_every:
+                            self.db.update_commit_locs(pending)
+                            pending = []
+                    elif missing:
+                        gone.append(commit['sha'])
+                    yield commit, additions, deletions
+        finally:
+            self.db.update_commit_locs(pending)
+            self.db.defer_loc(gone)
+
+    def fetch_loc_batch(self, username: str, batch_size: int = 500, workers: int = LOC_WORKERS) -> int:
         """Fetch LOC data for commits that don't have it."""
+        self.db.refresh_loc_queue()
         commits = self.db.get_commits_needing_loc(username, batch_size)
         print(f'  {len(commits)} commits need LOC data')
-        
+
         fetched = 0
-        for commit in commits:
-            additions, deletions = GitHubAPI.get_commit_stats(commit['url'])
+        started = time.time()
+        for _, additions, _ in self.iter_loc_stats(commits, workers):
             if additions is not None:
-                self.db.update_commit_loc(commit['sha'], additions, deletions)
                 fetched += 1
-                
+
                 if fetched % 50 == 0:
-                    print(f'    Fetched {fetched}/{len(commits)} LOC stats')
-            
-            time.sleep(REQUEST_DELAY)
-        
+                    rate = fetched / max(time.time() - started, 1e-6)
+                    print(f'    Fetched {fetched}/{len(commits)} LOC stats ({rate:.1f} commits/s)')
+
+        if fetched:
+            rate = fetched / max(time.time() - started, 1e-6)
+            print(f'    Fetched {fetched} LOC stats at {rate:.1f} commits/s')
         return fetched
 
     def fetch_languages(self, username: str) -> int:
         """Fetch language stats for all repos of a user."""
         # Get all unique repos for this user
-        conn = self.db._get_conn()
+        conn = self.db._get_read_conn()
         repos = conn.execute('''
             SELECT DISTINCT repo FROM commits
             WHERE username = ? AND repo IS NOT NULL AND repo != ''
         ''', (username,)).fetchall()
-        conn.close()
 
         fetched = 0
         for (repo,) in repos:
             # Check if already fetched
-            conn = self.db._get_conn()
+            conn = self.db._get_read_conn()
             existing = conn.execute('SELECT 1 FROM languages WHERE repo = ?', (repo,)).fetchone()
-            conn.close()
             if existing:
                 continue
 
             # Fetch from GitHub
             try:
-                resp = requests.get(
-                    f'https://api.github.com/repos/{repo}/languages',
-                    headers=GitHubAPI.get_headers()
-                )
-                if resp.status_code == 200:
-                    languages = resp.json()
+                status, languages = GitHubAPI.get_json(f'https://api.github.com/repos/{repo}/languages')
+                if status == 200:
                     conn = self.db._get_conn()
-                    for lang, bytes_count in languages.items():
-                        conn.execute('''
-                            INSERT OR REPLACE INTO languages (repo, username, language, bytes, fetched_at)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (repo, username, lang, bytes_count, datetime.now().isoformat()))
-                    conn.commit()
-                    conn.close()
+                    with conn:
+                        for lang, bytes_count in languages.items():
+                            conn.execute('''
+                                INSERT OR REPLACE INTO languages (repo, username, language, bytes, fetched_at)
+                                VALUES (?, ?, ?, ?, ?)
+                            ''', (repo, username, lang, bytes_count, datetime.now().isoformat()))
+                        self.db._bump_generation(conn)
                     fetched += 1
 
                     if fetched % 20 == 0:
                         print(f'    Fetched languages for {fetched} repos')
-
-                time.sleep(REQUEST_DELAY)
             except Exception as e:
                 print(f'    Error fetching languages for {repo}: {e}')
 
@@ -833,7 +2119,7 @@ class GitHubStatsAnalyzer:
 
     def fetch_topics(self, username: str, limit: int = None) -> int:
         """Fetch topics/tags for repos of a user."""
-        conn = self.db._get_conn()
+        conn = self.db._get_read_conn()
         # Get repos ordered by commit count, optionally limited
         query = '''
             SELECT repo, COUNT(*) as commits FROM commits
@@ -843,42 +2129,37 @@ class GitHubStatsAnalyzer:
         if limit:
             query += f' LIMIT {limit}'
         repos = conn.execute(query, (username,)).fetchall()
-        conn.close()
 
         fetched = 0
         for row in repos:
             repo = row[0]
             # Check if already fetched
-            conn = self.db._get_conn()
+            conn = self.db._get_read_conn()
             existing = conn.execute('SELECT 1 FROM topics WHERE repo = ?', (repo,)).fetchone()
-            conn.close()
             if existing:
                 continue
 
             # Fetch from GitHub (need to accept topics preview header)
             try:
-                resp = requests.get(
+                status, repo_data = GitHubAPI.get_json(
                     f'https://api.github.com/repos/{repo}',
                     headers={**REST_HEADERS, 'Accept': 'application/vnd.github.mercy-preview+json'}
                 )
-                if resp.status_code == 200:
-                    repo_data = resp.json()
+                if status == 200:
                     topics = repo_data.get('topics', [])
                     if topics:
                         conn = self.db._get_conn()
-                        for topic in topics:
-                            conn.execute('''
-                                INSERT OR REPLACE INTO topics (repo, username, topic, fetched_at)
-                                VALUES (?, ?, ?, ?)
-                            ''', (repo, username, topic, datetime.now().isoformat()))
-                        conn.commit()
-                        conn.close()
+                        with conn:
+                            for topic in topics:
+                                conn.execute('''
+                                    INSERT OR REPLACE INTO topics (repo, username, topic, fetched_at)
+                                    VALUES (?, ?, ?, ?)
+                                ''', (repo, username, topic, datetime.now().isoformat()))
+                            self.db._bump_generation(conn)
                     fetched += 1
 
                     if fetched % 20 == 0:
                         print(f'    Fetched topics for {fetched} repos')
-
-                time.sleep(REQUEST_DELAY)
             except Exception as e:
                 print(f'    Error fetching topics for {repo}: {e}')
 
@@ -886,7 +2167,7 @@ class GitHubStatsAnalyzer:
 
     def fetch_repo_metadata(self, username: str, limit: int = None) -> int:
         """Fetch repository metadata (stars, forks, description) from GitHub."""
-        conn = self.db._get_conn()
+        conn = self.db._get_read_conn()
         # Get repos ordered by commit count
         query = '''
             SELECT repo, COUNT(*) as commits FROM commits
@@ -896,232 +2177,367 @@ class GitHubStatsAnalyzer:
         if limit:
             query += f' LIMIT {limit}'
         repos = conn.execute(query, (username,)).fetchall()
-        conn.close()
 
         fetched = 0
         for row in repos:
             repo = row[0]
             # Check if already fetched recently (within 7 days)
-            conn = self.db._get_conn()
+            conn = self.db._get_read_conn()
             existing = conn.execute('''
                 SELECT fetched_at FROM repos WHERE repo = ?
                 AND fetched_at > datetime('now', '-7 days')
             ''', (repo,)).fetchone()
-            conn.close()
             if existing:
                 continue
 
             # Fetch from GitHub
             try:
-                resp = requests.get(
-                    f'https://api.github.com/repos/{repo}',
-                    headers=REST_HEADERS, timeout=10
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
+                status, data = GitHubAPI.get_json(f'https://api.github.com/repos/{repo}', timeout=10)
+                if status == 200:
                     conn = self.db._get_conn()
-                    conn.execute('''
-                        INSERT OR REPLACE INTO repos
-                        (repo, username, description, homepage, stars, forks, watchers,
-                         open_issues, is_fork, is_archived, language, license,
-                         created_at, updated_at, pushed_at, default_branch, fetched_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        repo, username,
-                        data.get('description'),
-                        data.get('homepage'),
-                        data.get('stargazers_count', 0),
-                        data.get('forks_count', 0),
-                        data.get('watchers_count', 0),
-                        data.get('open_issues_count', 0),
-                        1 if data.get('fork') else 0,
-                        1 if data.get('archived') else 0,
-                        data.get('language'),
-                        data.get('license', {}).get('spdx_id') if data.get('license') else None,
-                        data.get('created_at'),
-                        data.get('updated_at'),
-                        data.get('pushed_at'),
-                        data.get('default_branch'),
-                        datetime.now().isoformat()
-                    ))
-                    conn.commit()
-                    conn.close()
+                    with conn:
+                        conn.execute('''
+                            INSERT OR REPLACE INTO repos
+                            (repo, username, description, homepage, stars, forks, watchers,
+                             open_issues, is_fork, is_archived, language, license,
+                             created_at, updated_at, pushed_at, default_branch, fetched_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (
+                            repo, username,
+                            data.get('description'),
+                            data.get('homepage'),
+                            data.get('stargazers_count', 0),
+                            data.get('forks_count', 0),
+                            data.get('watchers_count', 0),
+                            data.get('open_issues_count', 0),
+                            1 if data.get('fork') else 0,
+                            1 if data.get('archived') else 0,
+                            data.get('language'),
+                            data.get('license', {}).get('spdx_id') if data.get('license') else None,
+                            data.get('created_at'),
+                            data.get('updated_at'),
+                            data.get('pushed_at'),
+                            data.get('default_branch'),
+                            datetime.now().isoformat()
+                        ))
+                        self.db._bump_generation(conn)
                     fetched += 1
 
                     if fetched % 20 == 0:
                         print(f'    Fetched metadata for {fetched} repos')
-
-                time.sleep(REQUEST_DELAY)
             except Exception as e:
                 print(f'    Error fetching metadata for {repo}: {e}')
 
         return fetched
 
-    def get_user_data(self, username: str, fetch: bool = False) -> dict:
-        """Get all data for a user. If fetch=True, fetches new data from GitHub first."""
+    def get_user_data(self, username: str, fetch: bool = False, sections: list = None) -> dict:
+        """Get all data for a user, or only the named sections (see USER_SECTIONS).
+
+        If fetch=True, fetches new data from GitHub first.
+        """
         if fetch:
             self.fetch_all_commits(username)
             self.fetch_loc_batch(username, 200)
 
-        user = self.db.get_user(username)
-        stats = self.db.get_stats(username)
-        daily = self.db.get_daily_stats(username, START_DATE.isoformat())
-        yearly = self.db.get_yearly_stats(username)
-        top_repos = self.db.get_top_repos(username, 15, 'commits')
-        top_repos_loc = self.db.get_top_repos(username, 15, 'additions')
-        monthly = self.db.get_monthly_stats(username)
-        recent = self.db.get_recent_commits(username, 20)
+        return {name: USER_SECTIONS[name](self.db, username) for name in sections or USER_SECTIONS}
 
+    def active_users(self) -> list:
+        """Configured users first, then any others in the database; only users with commits."""
+        users = list(GITHUB_USERS)
+        for (username,) in self.db._get_read_conn().execute('SELECT username FROM users').fetchall():
+            if username not in users:
+                users.append(username)
+        totals = self.db.get_user_totals(users)
+        return [u for u in users if totals.get(u, {}).get('total_commits', 0) > 0]
+
+    def get_combined_data(self, usernames: list) -> dict:
+        """Data for the combined "All" view: stats, daily and yearly across users."""
+        combined_stats = get_combined_stats(usernames)
         return {
-            'user': user,
-            'stats': stats,
-            'daily': daily,
-            'yearly': yearly,
-            'top_repos': top_repos,
-            'top_repos_loc': top_repos_loc,
-            'monthly': monthly,
-            'recent': recent
+            'user': {'username': 'All', 'name': f'Combined ({len(usernames)} users)'},
+            'stats': combined_stats,
+            'daily': get_combined_daily(usernames),
+            'yearly': [{'year': k, **v} for k, v in combined_stats['yearly'].items()],
+            'top_repos': [],
+            'top_repos_loc': [],
+            'monthly': [],
+            'recent': []
         }
 
 
-def create_visualizations(data: dict) -> dict:
-    """Create Plotly visualizations."""
-    viz = {}
-    
-    # Daily commits line chart
+# Section name -> loader for GitHubStatsAnalyzer.get_user_data
+USER_SECTIONS = {
+    'user': lambda db, username: db.get_user(username),
+    'stats': lambda db, username: db.get_stats(username),
+    'daily': lambda db, username: db.get_daily_stats(username, START_DATE.isoformat()),
+    'yearly': lambda db, username: db.get_yearly_stats(username),
+    'top_repos': lambda db, username: db.get_top_repos(username, 15, 'commits'),
+    'top_repos_loc': lambda db, username: db.get_top_repos(username, 15, 'additions'),
+    'monthly': lambda db, username: db.get_monthly_stats(username),
+    'recent': lambda db, username: db.get_recent_commits(username, 20),
+}
+
+
+# Layout shared by every chart. Chart specs carry only their overrides, spelled
+# out as nested dicts (marker=dict(color=...)) so plotly.js can read them as-is
+CHART_LAYOUT = dict(
+    template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+    font=dict(color='#fff'), margin=dict(l=40, r=20, t=20, b=40)
+)
+# plotly.js has no named templates, so series payloads spell out the dark grid instead
+SERIES_LAYOUT = {
+    **{key: value for key, value in CHART_LAYOUT.items() if key != 'template'},
+    'xaxis': dict(gridcolor='#262626'), 'yaxis': dict(gridcolor='#262626'),
+}
+# Trace keys holding per-point arrays, stored as shared columns in series payloads
+SERIES_ARRAY_KEYS = ('x', 'y', 'z', 'text')
+
+
+def chart_commits_timeline(data: dict) -> dict:
+    """Daily commits with 7- and 30-day averages."""
     today = pd.Timestamp.now().normalize()
-    if data.get('daily'):
-        df = pd.DataFrame(data['daily'])
-        df['date'] = pd.to_datetime(df['date'])
-        df = df[df['date'] <= today]  # Filter to today
-        df['commits_7d'] = df['commits'].rolling(7, min_periods=1).mean()
-        df['commits_30d'] = df['commits'].rolling(30, min_periods=1).mean()
-
-        min_date = df['date'].min() if len(df) > 0 else today
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=df['date'], y=df['commits'], mode='lines',
-                                name='Daily', line=dict(color='rgba(255,255,255,0.2)', width=1)))
-        fig.add_trace(go.Scatter(x=df['date'], y=df['commits_7d'], mode='lines',
-                                name='7-day avg', line=dict(color='#fff', width=2)))
-        fig.add_trace(go.Scatter(x=df['date'], y=df['commits_30d'], mode='lines',
-                                name='30-day avg', line=dict(color='rgba(255,255,255,0.5)', width=2, dash='dash')))
-        fig.update_layout(
-            template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#fff'), margin=dict(l=40, r=20, t=20, b=40),
+    if not data.get('daily'):
+        return None
+
+    df = pd.DataFrame(data['daily'])
+    df['date'] = pd.to_datetime(df['date'])
+    df = df[df['date'] <= today]  # Filter to today
+    df['commits_7d'] = df['commits'].rolling(7, min_periods=1).mean()
+    df['commits_30d'] = df['commits'].rolling(30, min_periods=1).mean()
+
+    min_date = df['date'].min() if len(df) > 0 else today
+    return {
+        'traces': [
+            dict(type='scatter', x=df['date'], y=df['commits'], mode='lines',
+                 name='Daily', line=dict(color='rgba(255,255,255,0.2)', width=1)),
+            dict(type='scatter', x=df['date'], y=df['commits_7d'], mode='lines',
+                 name='7-day avg', line=dict(color='#fff', width=2)),
+            dict(type='scatter', x=df['date'], y=df['commits_30d'], mode='lines',
+                 name='30-day avg', line=dict(color='rgba(255,255,255,0.5)', width=2, dash='dash')),
+        ],
+        'layout': dict(
             xaxis=dict(gridcolor='#262626', range=[min_date, today]),
             yaxis=dict(gridcolor='#262626'),
             legend=dict(orientation='h', y=1.1)
-        )
-        viz['commits_timeline'] = fig.to_json()
-    
-    # LOC area chart
-    if data.get('daily'):
-        df = pd.DataFrame(data['daily'])
-        df['date'] = pd.to_datetime(df['date'])
-        # Filter to only dates up to today
-        today = pd.Timestamp.now().normalize()
-        df = df[df['date'] <= today]
-        df['net'] = df['additions'] - df['deletions']
-        df['net_30d'] = df['net'].rolling(30, min_periods=1).mean()
-
-        fig = go.Figure()
-        fig.add_trace(go.Bar(x=df['date'], y=df['additions'], name='Added',
-                            marker_color='rgba(255,255,255,0.7)'))
-        fig.add_trace(go.Bar(x=df['date'], y=-df['deletions'], name='Deleted',
-                            marker_color='rgba(255,255,255,0.3)'))
-        fig.add_trace(go.Scatter(x=df['date'], y=df['net_30d'], mode='lines',
-                                name='Net (30d)', line=dict(color='#fff', width=3)))
-        # Set x-axis range to end at today
-        min_date = df['date'].min() if len(df) > 0 else today
-        fig.update_layout(
-            template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#fff'), margin=dict(l=40, r=20, t=20, b=40), barmode='relative',
+        ),
+    }
+
+
+def chart_loc_timeline(data: dict) -> dict:
+    """Daily lines added/deleted with a 30-day net average."""
+    if not data.get('daily'):
+        return None
+
+    df = pd.DataFrame(data['daily'])
+    df['date'] = pd.to_datetime(df['date'])
+    # Filter to only dates up to today
+    today = pd.Timestamp.now().normalize()
+    df = df[df['date'] <= today]
+    df['net'] = df['additions'] - df['deletions']
+    df['net_30d'] = df['net'].rolling(30, min_periods=1).mean()
+
+    # Set x-axis range to end at today
+    min_date = df['date'].min() if len(df) > 0 else today
+    return {
+        'traces': [
+            dict(type='bar', x=df['date'], y=df['additions'], name='Added',
+                 marker=dict(color='rgba(255,255,255,0.7)')),
+            dict(type='bar', x=df['date'], y=-df['deletions'], name='Deleted',
+                 marker=dict(color='rgba(255,255,255,0.3)')),
+            dict(type='scatter', x=df['date'], y=df['net_30d'], mode='lines',
+                 name='Net (30d)', line=dict(color='#fff', width=3)),
+        ],
+        'layout': dict(
+            barmode='relative',
             xaxis=dict(gridcolor='#262626', range=[min_date, today]),
             yaxis=dict(gridcolor='#262626'),
             legend=dict(orientation='h', y=1.1)
-        )
-        viz['loc_timeline'] = fig.to_json()
-    
-    # Top repos bar chart
-    if data.get('top_repos'):
-        df = pd.DataFrame(data['top_repos'][:10])
-        df['short_repo'] = df['repo'].apply(lambda x: x.split('/')[-1][:20] if x else '')
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(x=df['commits'], y=df['short_repo'], orientation='h',
-                            marker_color='#fff', text=df['commits'], textposition='auto'))
-        fig.update_layout(
-            template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#fff'), margin=dict(l=120, r=20, t=20, b=40),
-            yaxis=dict(autorange='reversed'), xaxis_title='Commits'
-        )
-        viz['top_repos'] = fig.to_json()
-    
-    # Top repos by LOC
-    if data.get('top_repos_loc'):
-        df = pd.DataFrame(data['top_repos_loc'][:10])
-        df['short_repo'] = df['repo'].apply(lambda x: x.split('/')[-1][:20] if x else '')
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(x=df['additions'], y=df['short_repo'], orientation='h', name='Added',
-                            marker_color='rgba(255,255,255,0.8)'))
-        fig.add_trace(go.Bar(x=-df['deletions'], y=df['short_repo'], orientation='h', name='Deleted',
-                            marker_color='rgba(255,255,255,0.3)'))
-        fig.update_layout(
-            template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#fff'), margin=dict(l=120, r=20, t=20, b=40), barmode='relative',
-            yaxis=dict(autorange='reversed'), xaxis_title='Lines of Code',
+        ),
+    }
+
+
+def chart_top_repos(data: dict) -> dict:
+    """Top repos by commit count."""
+    if not data.get('top_repos'):
+        return None
+
+    df = pd.DataFrame(data['top_repos'][:10])
+    df['short_repo'] = df['repo'].apply(lambda x: x.split('/')[-1][:20] if x else '')
+
+    return {
+        'traces': [
+            dict(type='bar', x=df['commits'], y=df['short_repo'], orientation='h',
+                 marker=dict(color='#fff'), text=df['commits'], textposition='auto'),
+        ],
+        'layout': dict(
+            margin=dict(l=120, r=20, t=20, b=40),
+            yaxis=dict(autorange='reversed'), xaxis=dict(title=dict(text='Commits'))
+        ),
+    }
+
+
+def chart_top_repos_loc(data: dict) -> dict:
+    """Top repos by lines of code."""
+    if not data.get('top_repos_loc'):
+        return None
+
+    df = pd.DataFrame(data['top_repos_loc'][:10])
+    df['short_repo'] = df['repo'].apply(lambda x: x.split('/')[-1][:20] if x else '')
+
+    return {
+        'traces': [
+            dict(type='bar', x=df['additions'], y=df['short_repo'], orientation='h', name='Added',
+                 marker=dict(color='rgba(255,255,255,0.8)')),
+            dict(type='bar', x=-df['deletions'], y=df['short_repo'], orientation='h', name='Deleted',
+                 marker=dict(color='rgba(255,255,255,0.3)')),
+        ],
+        'layout': dict(
+            margin=dict(l=120, r=20, t=20, b=40), barmode='relative',
+            yaxis=dict(autorange='reversed'), xaxis=dict(title=dict(text='Lines of Code')),
             legend=dict(orientation='h', y=1.1)
-        )
-        viz['top_repos_loc'] = fig.to_json()
-    
-    # Monthly heatmap
-    if data.get('monthly'):
-        df = pd.DataFrame(data['monthly'])
-        pivot = df.pivot(index='year', columns='month', values='commits').fillna(0)
-        
-        fig = go.Figure(data=go.Heatmap(
+        ),
+    }
+
+
+def chart_heatmap(data: dict) -> dict:
+    """Monthly commit heatmap."""
+    if not data.get('monthly'):
+        return None
+
+    df = pd.DataFrame(data['monthly'])
+    pivot = df.pivot(index='year', columns='month', values='commits').fillna(0)
+
+    return {
+        'traces': [dict(
+            type='heatmap',
             z=pivot.values,
             x=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
             y=[str(y) for y in pivot.index],
             colorscale=[[0, '#0a0a0a'], [0.5, '#404040'], [1, '#ffffff']],
-            colorbar=dict(title='Commits')
-        ))
-        fig.update_layout(
-            template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#fff'), margin=dict(l=40, r=20, t=20, b=40)
-        )
-        viz['heatmap'] = fig.to_json()
-    
-    # Yearly bar chart
-    if data.get('yearly'):
-        df = pd.DataFrame(data['yearly'])
-
-        fig = go.Figure()
-        fig.add_trace(go.Bar(x=df['year'], y=df['commits'], name='Commits',
-                            marker_color='#fff', text=df['commits'], textposition='auto'))
-        fig.update_layout(
-            template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#fff'), margin=dict(l=40, r=20, t=20, b=40)
-        )
-        viz['yearly_commits'] = fig.to_json()
-
-    # Day of week bar chart
+            colorbar=dict(title=dict(text='Commits'))
+        )],
+        'layout': {},
+    }
+
+
+def chart_yearly_commits(data: dict) -> dict:
+    """Commits per year."""
+    if not data.get('yearly'):
+        return None
+
+    df = pd.DataFrame(data['yearly'])
+
+    return {
+        'traces': [
+            dict(type='bar', x=df['year'], y=df['commits'], name='Commits',
+                 marker=dict(color='#fff'), text=df['commits'], textposition='auto'),
+        ],
+        'layout': {},
+    }
+
+
+def chart_day_of_week(data: dict) -> dict:
+    """Commits by day of week."""
     stats = data.get('stats', {})
     dow_stats = stats.get('day_of_week_stats', {})
-    if dow_stats:
-        days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        days = [d for d in days_order if d in dow_stats]
-        values = [dow_stats.get(d, 0) for d in days]
-
-        fig = go.Figure()
-        fig.add_trace(go.Bar(x=days, y=values, marker_color='#fff', text=values, textposition='auto'))
-        fig.update_layout(
-            template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#fff'), margin=dict(l=40, r=20, t=20, b=40)
-        )
-        viz['day_of_week'] = fig.to_json()
+    if not dow_stats:
+        return None
+
+    days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    days = [d for d in days_order if d in dow_stats]
+    values = [dow_stats.get(d, 0) for d in days]
+
+    return {
+        'traces': [dict(type='bar', x=days, y=values, marker=dict(color='#fff'), text=values, textposition='auto')],
+        'layout': {},
+    }
+
 
+def render_figure(spec: dict) -> str:
+    """Serialized Plotly figure for a chart spec, shared layout included."""
+    fig = go.Figure(data=spec['traces'])
+    fig.update_layout(**CHART_LAYOUT)
+    fig.update_layout(**spec['layout'])
+    return fig.to_json()
+
+
+def _series_values(values):
+    """Array or scalar as plain JSON: dates as YYYY-MM-DD, floats to 2 places."""
+    if isinstance(values, pd.Timestamp):
+        return values.strftime('%Y-%m-%d')
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        return np.datetime_as_string(array, unit='D').tolist()
+    if np.issubdtype(array.dtype, np.floating):
+        return np.round(array, 2).tolist()
+    return array.tolist()
+
+
+# Axis range bound the client replaces with its own date, so series stay the same from day to day
+SERIES_TODAY = 'today'
+
+
+def _series_layout(layout: dict, today=None) -> dict:
+    today = pd.Timestamp.now().normalize() if today is None else today
+    return {
+        key: _series_layout(value, today) if isinstance(value, dict)
+        else [SERIES_TODAY if v == today else _series_values(v) for v in value] if key == 'range'
+        else value
+        for key, value in layout.items()
+    }
+
+
+def render_series(spec: dict) -> dict:
+    """Compact chart spec: columnar arrays, traces and layout overrides only.
+
+    Each distinct per-point array is stored once in 'columns' and traces refer
+    to it by index (the daily dates back three traces, bar labels repeat y).
+    The client builds the figure by merging the overrides onto SERIES_LAYOUT,
+    which is sent once per response rather than once per chart. An axis range
+    ending today ends at SERIES_TODAY instead, filled in by the client.
+    """
+    columns = []
+    column_index = {}
+    traces = []
+    for trace in spec['traces']:
+        trace = dict(trace)
+        for key in SERIES_ARRAY_KEYS:
+            if key in trace:
+                values = _series_values(trace[key])
+                ident = json.dumps(values)
+                if ident not in column_index:
+                    column_index[ident] = len(columns)
+                    columns.append(values)
+                trace[key] = column_index[ident]
+        traces.append(trace)
+    return {'columns': columns, 'traces': traces, 'layout': _series_layout(spec['layout'])}
+
+
+# Chart name -> (user data sections it reads, builder returning a chart spec or None)
+CHART_BUILDERS = {
+    'commits_timeline': (('daily',), chart_commits_timeline),
+    'loc_timeline': (('daily',), chart_loc_timeline),
+    'top_repos': (('top_repos',), chart_top_repos),
+    'top_repos_loc': (('top_repos_loc',), chart_top_repos_loc),
+    'heatmap': (('monthly',), chart_heatmap),
+    'yearly_commits': (('yearly',), chart_yearly_commits),
+    'day_of_week': (('stats',), chart_day_of_week),
+}
+
+
+def create_visualizations(data: dict, charts: list = None, series: bool = False) -> dict:
+    """Create visualizations, all of them or just the named charts.
+
+    Each is a serialized Plotly figure, or with series=True the compact
+    render_series form to be laid out over SERIES_LAYOUT by the client.
+    """
+    render = render_series if series else render_figure
+    viz = {}
+    for name in charts or CHART_BUILDERS:
+        _, build = CHART_BUILDERS[name]
+        spec = build(data)
+        if spec:
+            viz[name] = render(spec)
     return viz
 
 
@@ -1131,36 +2547,153 @@ analyzer = GitHubStatsAnalyzer()
 
 def init_default_users():
     """Fetch data for default users on startup if they don't have data."""
+    new_users = []
     for username in GITHUB_USERS:
         stats = analyzer.db.get_stats(username)
         if stats.get('total_commits', 0) == 0:
-            print(f'\nInitializing data for {username}...')
-            # Fetch user profile
+            new_users.append(username)
+        elif not analyzer.db.get_user(username):
+            print(f'\nFetching profile for {username}...')
             user_data = GitHubAPI.get_user_profile(username)
             if user_data:
                 analyzer.db.save_user(user_data)
                 print(f'  Saved profile for {user_data.get("name", username)}')
-            # Fetch commits
-            analyzer.fetch_all_commits(username)
-            # Fetch some LOC data
+
+    if new_users:
+        print(f'\nInitializing data for {", ".join(new_users)}...')
+        # Fetches profiles too, then all users' months share one worker pool
+        analyzer.sync_users(new_users)
+        for username in new_users:
             analyzer.fetch_loc_batch(username, 100)
-        else:
-            # Check if user profile exists
-            user = analyzer.db.get_user(username)
-            if not user:
-                print(f'\nFetching profile for {username}...')
-                user_data = GitHubAPI.get_user_profile(username)
-                if user_data:
-                    analyzer.db.save_user(user_data)
-                    print(f'  Saved profile for {user_data.get("name", username)}')
 
 
 # Run initialization in background thread on startup
-import threading
 init_thread = threading.Thread(target=init_default_users, daemon=True)
 init_thread.start()
 
 
+class ResponseCache:
+    """LRU cache of serialized JSON responses, bounded by total body size.
+
+    Entries remember the generation they were built from, any comparable stamp
+    such as (database generation, date); a lookup under any other generation is
+    a miss, so a write anywhere invalidates them.
+    Compressed variants are added as clients ask for them and count toward the
+    budget alongside the plain body.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (generation, etag, {encoding or None: body})
+        self._lock = threading.Lock()
+
+    def get(self, key: str, generation) -> tuple:
+        """Return (etag, bodies by encoding) for key at generation, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != generation:
+                self._evict(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: str, generation, etag: str, body: bytes):
+        """Store a response body, evicting least recently used entries to stay in budget."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (generation, etag, {None: body})
+            self.size += len(body)
+            self._shrink()
+
+    def add_encoding(self, key: str, generation, encoding: str, body: bytes):
+        """Attach a compressed variant to a cached entry still at generation."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation or encoding in entry[2]:
+                return
+            entry[2][encoding] = body
+            self.size += len(body)
+            self._shrink()
+
+    def _shrink(self):
+        while self.size > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: str):
+        self.size -= sum(len(body) for body in self._entries.pop(key)[2].values())
+
+
+RESPONSE_CACHE = ResponseCache(RESPONSE_CACHE_MB * 1024 * 1024)
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+
+
+def compress_body(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """gzip or brotli a body; best trades time for size, for one-off static files."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if best else 5)
+    return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+
+
+def negotiate_encoding(size: int) -> str:
+    """Content-Encoding for a body of size bytes: 'br', 'gzip' or None."""
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    if brotli and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def cached_json(key: str, build):
+    """Serve build()'s JSON payload from RESPONSE_CACHE, with ETag revalidation.
+
+    Bodies are compressed per Accept-Encoding and the compressed variant is
+    cached too, so each one is compressed once per database generation.
+    Entries and ETags are also tied to today's date, since payloads hold
+    date-relative values (periods, current streaks) that change at midnight
+    without a write. Failed payloads (success is false) are returned but
+    never cached.
+    """
+    today = date.today().isoformat()
+    generation = (analyzer.db.generation(), today)
+    cached = RESPONSE_CACHE.get(key, generation)
+    if cached:
+        etag, bodies = cached
+    else:
+        payload = build()
+        body = app.json.dumps(payload).encode()
+        etag = f'{generation[0]}-{today}-{hashlib.sha1(body).hexdigest()[:16]}'
+        bodies = {None: body}
+        if payload.get('success'):
+            RESPONSE_CACHE.put(key, generation, etag, body)
+
+    body = bodies[None]
+    encoding = negotiate_encoding(len(body))
+    if encoding:
+        body = bodies.get(encoding)
+        if body is None:
+            body = compress_body(bodies[None], encoding)
+            RESPONSE_CACHE.add_encoding(key, generation, encoding, body)
+        etag = f'{etag}-{encoding}'  # each encoding is a distinct representation
+
+    resp = Response(body, mimetype='application/json')
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    resp.vary.add('Accept-Encoding')
+    resp.set_etag(etag)
+    resp.cache_control.no_cache = True  # always revalidate; a 304 costs one counter lookup
+    return resp.make_conditional(request)
+
+
 # Flask routes
 @app.route('/')
 def index():
@@ -1171,250 +2704,217 @@ def get_combined_stats(usernames: list) -> dict:
     """Get combined stats across multiple users."""
     if not usernames:
         raise ValueError("usernames list cannot be empty")
-    conn = analyzer.db._get_conn()
+    return analyzer.db.get_stats_for(usernames)
 
-    # Combined totals
-    placeholders = ','.join(['?' for _ in usernames])
-    total = conn.execute(f'SELECT COUNT(*) FROM commits WHERE username IN ({placeholders})', usernames).fetchone()[0]
-    with_loc = conn.execute(f'SELECT COUNT(*) FROM commits WHERE username IN ({placeholders}) AND additions IS NOT NULL', usernames).fetchone()[0]
-
-    totals = conn.execute(f'''
-        SELECT COALESCE(SUM(additions), 0) as total_additions, COALESCE(SUM(deletions), 0) as total_deletions
-        FROM commits WHERE username IN ({placeholders})
-    ''', usernames).fetchone()
-
-    dates = conn.execute(f'SELECT MIN(date) as first, MAX(date) as last FROM commits WHERE username IN ({placeholders})', usernames).fetchone()
-    active_days = conn.execute(f'SELECT COUNT(DISTINCT date) FROM commits WHERE username IN ({placeholders})', usernames).fetchone()[0]
-    unique_repos = conn.execute(f'SELECT COUNT(DISTINCT repo) FROM commits WHERE username IN ({placeholders})', usernames).fetchone()[0]
-
-    # Max commits in a day
-    max_day = conn.execute(f'''
-        SELECT date, COUNT(*) as cnt FROM commits
-        WHERE username IN ({placeholders}) GROUP BY date ORDER BY cnt DESC LIMIT 1
-    ''', usernames).fetchone()
-
-    # Day of week analysis
-    dow_stats = conn.execute(f'''
-        SELECT
-            CASE CAST(strftime('%w', date) AS INTEGER)
-                WHEN 0 THEN 'Sunday' WHEN 1 THEN 'Monday' WHEN 2 THEN 'Tuesday'
-                WHEN 3 THEN 'Wednesday' WHEN 4 THEN 'Thursday' WHEN 5 THEN 'Friday' WHEN 6 THEN 'Saturday'
-            END as day, COUNT(*) as commits
-        FROM commits WHERE username IN ({placeholders})
-        GROUP BY strftime('%w', date) ORDER BY commits DESC
-    ''', usernames).fetchall()
-
-    # Average LOC per commit
-    avg_loc = conn.execute(f'''
-        SELECT AVG(additions + deletions) FROM commits
-        WHERE username IN ({placeholders}) AND additions IS NOT NULL
-    ''', usernames).fetchone()[0] or 0
-
-    # Streak calculation
-    all_dates = [r[0] for r in conn.execute(
-        f'SELECT DISTINCT date FROM commits WHERE username IN ({placeholders}) ORDER BY date', usernames
-    ).fetchall()]
 
-    current_streak = 0
-    longest_streak = 0
-    if all_dates:
-        today = datetime.now().strftime('%Y-%m-%d')
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-
-        if all_dates[-1] == today or all_dates[-1] == yesterday:
-            current_streak = 1
-            for i in range(len(all_dates) - 2, -1, -1):
-                d1 = datetime.strptime(all_dates[i], '%Y-%m-%d')
-                d2 = datetime.strptime(all_dates[i + 1], '%Y-%m-%d')
-                if (d2 - d1).days == 1:
-                    current_streak += 1
-                else:
-                    break
+def get_combined_daily(usernames: list) -> list:
+    """Get combined daily stats, merged from the users' stats partials."""
+    partial = merge_stats_partials([analyzer.db.stats_partial(u) for u in usernames])
+    dates = partial['days'].astype('datetime64[D]').astype(str).tolist()
+    return [
+        {'date': day, 'commits': commits, 'additions': additions, 'deletions': deletions}
+        for day, commits, additions, deletions in zip(
+            dates, partial['commits'].tolist(), partial['additions'].tolist(), partial['deletions'].tolist(),
+            strict=True)
+    ]
 
-        streak = 1
-        for i in range(1, len(all_dates)):
-            d1 = datetime.strptime(all_dates[i - 1], '%Y-%m-%d')
-            d2 = datetime.strptime(all_dates[i], '%Y-%m-%d')
-            if (d2 - d1).days == 1:
-                streak += 1
-            else:
-                longest_streak = max(longest_streak, streak)
-                streak = 1
-        longest_streak = max(longest_streak, streak)
 
-    # Yearly breakdown
-    yearly = {}
-    yearly_rows = conn.execute(f'''
-        SELECT strftime('%Y', date) as year, COUNT(*) as commits,
-            COALESCE(SUM(additions), 0) as additions, COALESCE(SUM(deletions), 0) as deletions,
-            COUNT(DISTINCT date) as days_active
-        FROM commits WHERE username IN ({placeholders})
-        GROUP BY strftime('%Y', date) ORDER BY year
-    ''', usernames).fetchall()
-    for row in yearly_rows:
-        yearly[row['year']] = {
-            'commits': row['commits'], 'additions': row['additions'], 'deletions': row['deletions'],
-            'net_loc': row['additions'] - row['deletions'], 'days_active': row['days_active']
-        }
+def encode_daily_columns(daily: list) -> dict:
+    """Daily rows as parallel integer arrays with delta-encoded days.
 
-    # Period stats (7d, 30d, 90d, ytd, 1y)
-    today = datetime.now()
-    year_start = f'{today.year}-01-01'
-    periods = {
-        '7d': (today - timedelta(days=7)).strftime('%Y-%m-%d'),
-        '30d': (today - timedelta(days=30)).strftime('%Y-%m-%d'),
-        '90d': (today - timedelta(days=90)).strftime('%Y-%m-%d'),
-        'ytd': year_start,
-        '1y': (today - timedelta(days=365)).strftime('%Y-%m-%d'),
-    }
+    days[i] is the gap from the previous row's date (0 for the first, which
+    falls on start); the other fields are one column each, in row order.
+    """
+    if not daily:
+        return {'start': None, 'days': []}
+    ordinals = np.array([row['date'] for row in daily], dtype='datetime64[D]').astype(np.int64)
+    columns = {'start': daily[0]['date'], 'days': np.diff(ordinals, prepend=ordinals[0]).tolist()}
+    for field in daily[0]:
+        if field != 'date':
+            columns[field] = [row[field] for row in daily]
+    return columns
 
-    period_stats = {}
-    for period, start_date in periods.items():
-        stats = conn.execute(f'''
-            SELECT
-                COUNT(*) as commits,
-                COALESCE(SUM(additions), 0) as additions,
-                COALESCE(SUM(deletions), 0) as deletions,
-                COUNT(DISTINCT date) as active_days,
-                COUNT(DISTINCT repo) as repos
-            FROM commits WHERE username IN ({placeholders}) AND date >= ?
-        ''', usernames + [start_date]).fetchone()
-        period_stats[period] = dict(stats)
 
-    # 30-day comparison for change calculation
-    thirty_days_ago = periods['30d']
-    sixty_days_ago = (today - timedelta(days=60)).strftime('%Y-%m-%d')
+def columnar_data(data: dict) -> dict:
+    """Copy of a user's data with the daily series in encode_daily_columns form."""
+    if 'daily' not in data:
+        return data
+    return {**data, 'daily': encode_daily_columns(data['daily'])}
 
-    prev_30d = conn.execute(f'''
-        SELECT COALESCE(SUM(additions), 0) as adds, COALESCE(SUM(deletions), 0) as dels
-        FROM commits WHERE username IN ({placeholders}) AND date >= ? AND date < ?
-    ''', usernames + [sixty_days_ago, thirty_days_ago]).fetchone()
 
-    # Handle empty result
-    if not prev_30d:
-        prev_30d = {'adds': 0, 'dels': 0}
+def requested_format() -> str:
+    """The ?format= wire format for daily series: 'rows' (default) or 'columnar'."""
+    return 'columnar' if request.args.get('format') == 'columnar' else 'rows'
 
-    # Calculate percentage change
-    additions_30d_change = 0
-    deletions_30d_change = 0
-    last_30d_adds = period_stats['30d']['additions']
-    last_30d_dels = period_stats['30d']['deletions']
-    if prev_30d['adds'] > 0:
-        additions_30d_change = round(((last_30d_adds - prev_30d['adds']) / prev_30d['adds']) * 100, 0)
-    elif last_30d_adds > 0:
-        additions_30d_change = 100
-    if prev_30d['dels'] > 0:
-        deletions_30d_change = round(((last_30d_dels - prev_30d['dels']) / prev_30d['dels']) * 100, 0)
-    elif last_30d_dels > 0:
-        deletions_30d_change = 100
 
-    conn.close()
+def requested_viz() -> str:
+    """The ?viz= chart format: '1' Plotly figures (default), 'series' chart series, '0' none."""
+    viz = request.args.get('viz', '1')
+    return viz if viz in ('0', 'series') else '1'
 
-    first_date = datetime.strptime(dates['first'], '%Y-%m-%d') if dates['first'] else datetime.now()
-    total_days = (datetime.strptime(dates['last'], '%Y-%m-%d') - first_date).days + 1 if dates['first'] else 0
-    years_coding = (datetime.now() - first_date).days / 365.25 if dates['first'] else 0
 
-    return {
-        'total_commits': total, 'with_loc': with_loc, 'missing_loc': total - with_loc,
-        'total_additions': totals['total_additions'], 'total_deletions': totals['total_deletions'],
-        'net_loc_change': totals['total_additions'] - totals['total_deletions'],
-        'first_commit': dates['first'], 'last_commit': dates['last'],
-        'total_days': total_days, 'active_days': active_days, 'unique_repos': unique_repos,
-        'years_coding': round(years_coding, 1), 'average_commits': round(total / max(active_days, 1), 1),
-        'average_loc_per_commit': round(avg_loc, 0),
-        'maximum_commits': max_day['cnt'] if max_day else 0,
-        'max_commit_date': max_day['date'] if max_day else None,
-        'current_streak': current_streak,
-        'longest_streak': longest_streak,
-        'most_productive_day': dow_stats[0]['day'] if dow_stats else None,
-        'day_of_week_stats': {r['day']: r['commits'] for r in dow_stats},
-        'yearly': yearly,
-        'periods': period_stats,
-        'additions_30d_change': additions_30d_change,
-        'deletions_30d_change': deletions_30d_change,
-    }
+@app.route('/api/data')
+def get_data():
+    viz = requested_viz()
+    series = viz == 'series'
+    daily_format = requested_format()
 
+    def build():
+        try:
+            all_data = {}
+            all_viz = {}
 
-def get_combined_daily(usernames: list) -> list:
-    """Get combined daily stats."""
-    conn = analyzer.db._get_conn()
-    placeholders = ','.join(['?' for _ in usernames])
-    rows = conn.execute(f'''
-        SELECT date, COUNT(*) as commits, COALESCE(SUM(additions), 0) as additions,
-            COALESCE(SUM(deletions), 0) as deletions
-        FROM commits WHERE username IN ({placeholders})
-        GROUP BY date ORDER BY date
-    ''', usernames).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+            active_users = analyzer.active_users()
+            for username in active_users:
+                print(f'Loading data for {username}...')
+                data = analyzer.get_user_data(username, fetch=False)
+                all_data[username] = data
+                if viz != '0':
+                    all_viz[username] = create_visualizations(data, series=series)
+
+            # Create combined "All" view if multiple users
+            if len(active_users) > 1:
+                print('Creating combined view...')
+                combined_data = analyzer.get_combined_data(active_users)
+                all_data['All'] = combined_data
+                if viz != '0':
+                    all_viz['All'] = create_visualizations(combined_data, series=series)
+                active_users.insert(0, 'All')  # Put "All" first
+
+            if daily_format == 'columnar':
+                all_data = {username: columnar_data(data) for username, data in all_data.items()}
+
+            result = {
+                'success': True,
+                'data': all_data,
+                'visualizations': all_viz,
+                'users': active_users
+            }
+            if series:
+                result['layout'] = SERIES_LAYOUT
+            if daily_format == 'columnar':
+                result['format'] = 'columnar'
+            return result
+        except Exception as e:
+            import traceback
+            if DEBUG:
+                traceback.print_exc()
+            return {'success': False, 'error': str(e)}
+
+    return cached_json(f'data:{viz}:{daily_format}', build)
+
+
+def user_index(usernames: list, combined: list = None) -> tuple:
+    """(users, data) index entries with profile and headline totals per username.
+
+    When combined lists more than one user the entries start with an 'All'
+    entry totalling them.
+    """
+    profiles = analyzer.db.get_users(usernames)
+    totals = analyzer.db.get_user_totals(usernames)
+    users = []
+    data = {}
+    if combined and len(combined) > 1:
+        combined_totals = analyzer.db.get_user_totals(combined).values()
+        users.append('All')
+        data['All'] = {
+            'user': {'username': 'All', 'name': f'Combined ({len(combined)} users)'},
+            'stats': {
+                'total_commits': sum(t['total_commits'] for t in combined_totals),
+                'total_additions': sum(t['total_additions'] for t in combined_totals),
+                'total_deletions': sum(t['total_deletions'] for t in combined_totals),
+            },
+        }
+    for username in usernames:
+        users.append(username)
+        data[username] = {'user': profiles.get(username), 'stats': totals.get(username)}
+    return users, data
 
 
-@app.route('/api/data')
-def get_data():
-    try:
-        all_data = {}
-        all_viz = {}
+@app.route('/api/index')
+def get_index():
+    """Page through active users with their profile and headline totals.
 
-        # Get users from database + configured users
-        conn = analyzer.db._get_conn()
-        db_users = [r[0] for r in conn.execute('SELECT username FROM users').fetchall()]
-        conn.close()
+    Cheap enough to serve on first paint for any number of accounts; the
+    dashboard then loads /api/user/<username> only for the selected view.
+    """
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
 
-        # Merge: configured users first, then any additional from DB
-        users = list(GITHUB_USERS)
-        for u in db_users:
-            if u not in users:
-                users.append(u)
-
-        active_users = []
-        for username in users:
-            print(f'Loading data for {username}...')
-            data = analyzer.get_user_data(username, fetch=False)
-            if data.get('stats') and data['stats'].get('total_commits', 0) > 0:
-                all_data[username] = data
-                all_viz[username] = create_visualizations(data)
-                active_users.append(username)
-
-        # Create combined "All" view if multiple users
-        if len(active_users) > 1:
-            print('Creating combined view...')
-            combined_stats = get_combined_stats(active_users)
-            combined_daily = get_combined_daily(active_users)
-            combined_data = {
-                'user': {'username': 'All', 'name': f'Combined ({len(active_users)} users)'},
-                'stats': combined_stats,
-                'daily': combined_daily,
-                'yearly': [{'year': k, **v} for k, v in combined_stats['yearly'].items()],
-                'top_repos': [],
-                'top_repos_loc': [],
-                'monthly': [],
-                'recent': []
+    def build():
+        try:
+            active_users = analyzer.active_users()
+            page = active_users[offset:offset + limit]
+            users, data = user_index(page, active_users if offset == 0 else None)
+            next_offset = offset + limit if offset + limit < len(active_users) else None
+            return {
+                'success': True,
+                'users': users,
+                'data': data,
+                'total': len(active_users),
+                'next_offset': next_offset,
             }
-            all_data['All'] = combined_data
-            all_viz['All'] = create_visualizations(combined_data)
-            active_users.insert(0, 'All')  # Put "All" first
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    return cached_json(f'index:{offset}:{limit}', build)
 
-        return jsonify({
-            'success': True,
-            'data': all_data,
-            'visualizations': all_viz,
-            'users': active_users
-        })
-    except Exception as e:
-        import traceback
-        if DEBUG:
-            traceback.print_exc()
-        return jsonify({'success': False, 'error': str(e)})
+
+def load_view_data(username: str, sections: list = None) -> dict:
+    """Data for one user, or the combined view when username is 'All'."""
+    if username == 'All':
+        return analyzer.get_combined_data(analyzer.active_users())
+    return analyzer.get_user_data(username, sections=sections)
 
 
 @app.route('/api/user/<username>')
 def get_user_data(username):
-    try:
-        data = analyzer.get_user_data(username)
-        viz = create_visualizations(data)
-        return jsonify({'success': True, 'data': data, 'visualizations': viz})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    """One user's data (or 'All').
+
+    ?viz=series sends chart series, ?viz=0 no charts; ?format=columnar sends
+    the daily series as columns.
+    """
+    viz = requested_viz()
+    daily_format = requested_format()
+
+    def build():
+        try:
+            data = load_view_data(username)
+            result = {'success': True, 'data': data}
+            if viz == 'series':
+                result['visualizations'] = create_visualizations(data, series=True)
+                result['layout'] = SERIES_LAYOUT
+            elif viz != '0':
+                result['visualizations'] = create_visualizations(data)
+            if daily_format == 'columnar':
+                result['data'] = columnar_data(data)
+                result['format'] = 'columnar'
+            return result
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    return cached_json(f'user:{username}:{viz}:{daily_format}', build)
+
+
+@app.route('/api/user/<username>/charts/<chart>')
+def get_user_chart(username, chart):
+    """A single chart, loading only the data sections it reads; ?viz=series for its series."""
+    if chart not in CHART_BUILDERS:
+        return jsonify({'success': False, 'error': f'Unknown chart: {chart}'}), 404
+    sections, _ = CHART_BUILDERS[chart]
+    series = requested_viz() == 'series'
+
+    def build():
+        try:
+            data = load_view_data(username, list(sections))
+            result = {'success': True, 'chart': create_visualizations(data, [chart], series).get(chart)}
+            if series:
+                result['layout'] = SERIES_LAYOUT
+            return result
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    return cached_json(f'chart:{username}:{chart}:{int(series)}', build)
 
 
 @app.route('/api/stats')
@@ -1425,14 +2925,118 @@ def get_stats():
     return jsonify({'success': True, 'stats': stats})
 
 
+# Slim copy of the database served to sql.js, rebuilt on demand after writes
+SQLJS_PATH = DB_PATH.with_name(f'{DB_PATH.stem}.sqljs.db')
+SQLJS_LOCK = threading.Lock()
+
+
+def sqljs_generation(path: Path):
+    """Generation an export_sqljs file was built from, or None if it doesn't exist."""
+    if not path.exists():
+        return None
+    conn = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro', uri=True)
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def sqljs_config(path: Path, generation: int, url: str) -> dict:
+    """sql.js-httpvfs config for reading path over HTTP range requests.
+
+    Pages are SQLJS_PAGE_SIZE bytes (see StatsDB.export_sqljs), so each range
+    request the client makes covers exactly one page.
+    """
+    return {
+        'serverMode': 'full',
+        'url': url,
+        'requestChunkSize': SQLJS_PAGE_SIZE,
+        'databaseLengthBytes': path.stat().st_size,
+        'generation': generation,
+    }
+
+
+def refresh_sqljs() -> int:
+    """Rebuild SQLJS_PATH if the database changed since it was built; its generation.
+
+    Callers hold SQLJS_LOCK.
+    """
+    generation = analyzer.db.generation()
+    if sqljs_generation(SQLJS_PATH) != generation:
+        analyzer.db.export_sqljs(SQLJS_PATH)
+    return generation
+
+
+# Full copy of the database served at /stats.db, taken again after writes
+BACKUP_PATH = DB_PATH.with_name(f'{DB_PATH.stem}.backup.db')
+BACKUP_LOCK = threading.Lock()
+
+
+def backup_generation(path: Path):
+    """Generation a StatsDB.backup file was taken at, or None if it doesn't exist."""
+    if not path.exists():
+        return None
+    conn = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro', uri=True)
+    try:
+        row = conn.execute("SELECT value FROM db_meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+    finally:
+        conn.close()
+
+
 @app.route('/stats.db')
 def serve_stats_db():
-    """Serve the SQLite database file for client-side SQL queries."""
+    """Serve a full copy of the database, like the export's stats.db.
+
+    The copy is taken with StatsDB.backup, so it is consistent and includes
+    the WAL, and is only taken again after database writes.
+    """
     from flask import send_file
-    db_path = DB_PATH
-    if db_path.exists():
-        return send_file(db_path, mimetype='application/octet-stream')
-    return jsonify({'error': 'Database not found'}), 404
+    if not DB_PATH.exists():
+        return jsonify({'error': 'Database not found'}), 404
+    # send_file opens the file before returning, so a new copy can't swap it mid-response
+    with BACKUP_LOCK:
+        if backup_generation(BACKUP_PATH) != analyzer.db.generation():
+            analyzer.db.backup(BACKUP_PATH)
+        return send_file(BACKUP_PATH, mimetype='application/octet-stream', conditional=True)
+
+
+@app.route('/stats.sqljs.db')
+def serve_sqljs_db():
+    """Serve the slim SQLite database for client-side SQL queries.
+
+    Range requests are supported, so a lazy client can read only the pages a
+    query touches. With ?g=<generation> (the URL /stats.sqljs.db.json hands out) the
+    file is served only if it is still that build, and 412 otherwise, so pages
+    from two builds are never mixed; such responses never change and are
+    cached for a year.
+    """
+    from flask import send_file
+    if not DB_PATH.exists():
+        return jsonify({'error': 'Database not found'}), 404
+    pinned = request.args.get('g', type=int)
+    # send_file opens the file before returning, so a rebuild can't swap it mid-response
+    with SQLJS_LOCK:
+        if pinned is None:
+            refresh_sqljs()
+            return send_file(SQLJS_PATH, mimetype='application/octet-stream', conditional=True)
+        if sqljs_generation(SQLJS_PATH) != pinned:
+            return jsonify({'error': 'Database has changed, reload stats.sqljs.db.json'}), 412
+        return send_file(SQLJS_PATH, mimetype='application/octet-stream', conditional=True,
+                         max_age=365 * 24 * 3600)
+
+
+@app.route('/stats.sqljs.db.json')
+def serve_sqljs_db_config():
+    """Range-request config for the current /stats.sqljs.db build."""
+    if not DB_PATH.exists():
+        return jsonify({'error': 'Database not found'}), 404
+    with SQLJS_LOCK:
+        generation = refresh_sqljs()
+        config = sqljs_config(SQLJS_PATH, generation, f'stats.sqljs.db?g={generation}')
+    response = jsonify(config)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @app.route('/api/top-repos/<username>')
@@ -1445,19 +3049,25 @@ def get_top_repos(username):
 
 @app.route('/api/search/<username>')
 def search_commits(username):
-    from flask import request
-    query = request.args.get('q', '')
-    commits = analyzer.db.search_commits(username, query)
-    return jsonify({'success': True, 'commits': commits})
+    """Ranked full-text search over a user's commits ('All' for everyone).
+
+    ?q= is matched word by word as prefixes; ?limit= caps the results (max 200).
+    """
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    try:
+        commits = analyzer.db.search_commits(None if username == 'All' else username, query, limit)
+        return jsonify({'success': True, 'query': query, 'commits': commits})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
 
 
 @app.route('/api/refresh')
 def refresh_data():
     # Clear fetch metadata to force refetch
     conn = analyzer.db._get_conn()
-    conn.execute('DELETE FROM fetch_meta')
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute('DELETE FROM fetch_meta')
     return jsonify({'success': True, 'message': 'Cache cleared'})
 
 
@@ -1473,17 +3083,20 @@ def fetch_more_loc():
 @app.route('/api/users')
 def list_users():
     """List all users in the database."""
-    conn = analyzer.db._get_conn()
+    conn = analyzer.db._get_read_conn()
     rows = conn.execute('SELECT username, avatar_url, name FROM users').fetchall()
-    conn.close()
     users = [{'username': r[0], 'avatar_url': r[1], 'name': r[2]} for r in rows]
     return jsonify({'success': True, 'users': users})
 
 
 @app.route('/api/repo/<path:repo_name>')
 def get_repo_details(repo_name):
-    """Get detailed info for a specific repository."""
-    conn = analyzer.db._get_conn()
+    """Get detailed info for a specific repository.
+
+    The commit queries read one range of the (repo, date) index, already in
+    date order for the recent and monthly listings.
+    """
+    conn = analyzer.db._get_read_conn()
 
     # Get commit stats
     commit_stats = conn.execute('''
@@ -1520,8 +3133,6 @@ def get_repo_details(repo_name):
         FROM commits WHERE repo = ? GROUP BY month ORDER BY month
     ''', (repo_name,)).fetchall()
 
-    conn.close()
-
     return jsonify({
         'success': True,
         'repo': repo_name,
@@ -1539,8 +3150,12 @@ def get_repo_details(repo_name):
 
 @app.route('/api/org/<org_name>')
 def get_org_details(org_name):
-    """Get aggregated info for an organization."""
-    conn = analyzer.db._get_conn()
+    """Get aggregated info for an organization.
+
+    Every query matches the indexed owner column, so this reads only the
+    org's rows however many commits are stored.
+    """
+    conn = analyzer.db._get_read_conn()
 
     # Get all repos for this org
     repos = conn.execute('''
@@ -1548,7 +3163,7 @@ def get_org_details(org_name):
                COALESCE(SUM(deletions), 0) as deletions,
                MIN(date) as first_commit, MAX(date) as last_commit
         FROM commits
-        WHERE repo LIKE ? || '/%'
+        WHERE owner = ?
         GROUP BY repo ORDER BY commits DESC
     ''', (org_name,)).fetchall()
 
@@ -1558,29 +3173,27 @@ def get_org_details(org_name):
                COALESCE(SUM(deletions), 0) as deletions,
                MIN(date) as first_commit, MAX(date) as last_commit,
                COUNT(DISTINCT repo) as repo_count
-        FROM commits WHERE repo LIKE ? || '/%'
+        FROM commits WHERE owner = ?
     ''', (org_name,)).fetchone()
 
     # Get languages across all repos
     languages = conn.execute('''
         SELECT language, SUM(bytes) as total_bytes FROM languages
-        WHERE repo LIKE ? || '/%' GROUP BY language ORDER BY total_bytes DESC LIMIT 10
+        WHERE owner = ? GROUP BY language ORDER BY total_bytes DESC LIMIT 10
     ''', (org_name,)).fetchall()
 
     # Get topics across all repos
     topics = conn.execute('''
         SELECT topic, COUNT(*) as count FROM topics
-        WHERE repo LIKE ? || '/%' GROUP BY topic ORDER BY count DESC LIMIT 20
+        WHERE owner = ? GROUP BY topic ORDER BY count DESC LIMIT 20
     ''', (org_name,)).fetchall()
 
     # Monthly activity
     monthly = conn.execute('''
         SELECT strftime('%Y-%m', date) as month, COUNT(*) as commits
-        FROM commits WHERE repo LIKE ? || '/%' GROUP BY month ORDER BY month
+        FROM commits WHERE owner = ? GROUP BY month ORDER BY month
     ''', (org_name,)).fetchall()
 
-    conn.close()
-
     return jsonify({
         'success': True,
         'org': org_name,
@@ -1594,79 +3207,331 @@ def get_org_details(org_name):
     })
 
 
-@app.route('/api/fetch/<username>')
-def fetch_user(username):
-    """Fetch all data for a new user with live progress streaming."""
-    from flask import Response
+JOB_FINISHED = ('complete', 'error')
+JOB_RETENTION_DAYS = 7
+JOB_POLL_SECONDS = 1.0  # how often followers look for events written by another process
+JOB_HEARTBEAT_SECONDS = 15.0
+
+
+class JobQueue:
+    """Background fetch jobs, stored in the jobs table and run by a fixed pool of threads.
+
+    Submitting work identical to a queued or running job returns that job, so
+    two tabs asking for the same fetch share one run. Progress events are
+    written to job_events as they happen and clients only follow them: a
+    disconnect neither stops the job nor loses its history, and any number
+    of clients can watch the same job.
+    """
+
+    def __init__(self, db: StatsDB, handlers: dict, workers: int):
+        self.db = db
+        self.handlers = handlers  # kind -> generator function yielding event dicts
+        self.workers = max(workers, 1)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pending = threading.Event()  # set when a job is queued
+        self._changed = threading.Condition()  # notified on every event and finish
+        self._version = 0
+
+    def start(self):
+        """Start the workers once, requeueing jobs a previous server left running."""
+        with self._lock:
+            if self._threads:
+                return
+            requeued = self.db.requeue_interrupted_jobs()
+            if requeued:
+                print(f'Resuming {requeued} interrupted job(s)')
+            self.db.prune_jobs(JOB_RETENTION_DAYS)
+            self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+
+    def submit(self, kind: str, params: dict = None) -> int:
+        """Queue a job of a known kind, or join the identical active one. Returns its id."""
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        job_id, created = self.db.submit_job(kind, params or {})
+        self.start()
+        if created:
+            self._pending.set()
+        return job_id
+
+    def follow(self, job_id: int, after: int = 0):
+        """Yield (seq, data) for a job's events after seq `after` until it finishes.
+
+        Yields None after JOB_HEARTBEAT_SECONDS without events, so callers can
+        keep an idle connection open. Events are read back from the database,
+        so a job run by another process is followed too, by polling.
+        """
+        last_sent = time.monotonic()
+        while True:
+            version = self._version
+            # Status before events: once a job reads as finished, all its events are visible
+            job = self.db.get_job(job_id)
+            if job is None:
+                return
+            for seq, data in self.db.get_job_events(job_id, after):
+                after = seq
+                last_sent = time.monotonic()
+                yield seq, data
+            if job['status'] in JOB_FINISHED:
+                return
+            with self._changed:
+                self._changed.wait_for(lambda version=version: self._version != version, timeout=JOB_POLL_SECONDS)
+            if time.monotonic() - last_sent >= JOB_HEARTBEAT_SECONDS:
+                last_sent = time.monotonic()
+                yield None
+
+    def _notify(self):
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    def _worker(self):
+        while True:
+            job = self.db.claim_job()
+            if job is None:
+                # Also wakes periodically for jobs queued by another process
+                self._pending.wait(timeout=JOB_POLL_SECONDS * 5)
+                self._pending.clear()
+                continue
+            self._run(job)
 
-    def generate():
-        yield f'data: {{"status": "starting", "message": "Fetching profile for {username}..."}}\n\n'
+    def _run(self, job: dict):
+        seq = job['last_seq']  # a resumed job appends after the events of its earlier run
+        status = 'complete'
 
-        # Fetch user profile
-        user_data = GitHubAPI.get_user_profile(username)
-        if not user_data:
-            yield f'data: {{"status": "error", "message": "User {username} not found"}}\n\n'
-            return
+        def emit(event: dict):
+            nonlocal seq
+            seq += 1
+            self.db.add_job_event(job['id'], seq, json.dumps(event))
+            self._notify()
+
+        try:
+            handler = self.handlers.get(job['kind'])
+            if handler is None:  # queued by a version of the app that had this kind
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            for event in handler(**job['params']):
+                if event.get('status') == 'error':
+                    status = 'error'
+                emit(event)
+        except Exception as e:
+            status = 'error'
+            emit({'status': 'error', 'message': str(e)})
+        self.db.finish_job(job['id'], status)
+        self._notify()
+
+
+def job_fetch_user(username: str):
+    """Fetch profile, commits and some LOC for a new user."""
+    yield {'status': 'starting', 'message': f'Fetching profile for {username}...'}
+
+    # Fetch user profile
+    user_data = GitHubAPI.get_user_profile(username)
+    if not user_data:
+        yield {'status': 'error', 'message': f'User {username} not found'}
+        return
+
+    # Save user
+    analyzer.db.save_user(user_data)
+    name = user_data.get('name', username)
+    yield {'status': 'progress', 'message': f'Profile saved: {name}'}
+
+    # Fetch commits
+    yield {'status': 'progress', 'message': f'Fetching commits since {START_DATE}...'}
+
+    for _, year, month, found in analyzer.iter_sync([username]):
+        yield {'status': 'progress', 'message': f'Fetched {year}-{month:02d}: {found} commits'}
+
+    stats = analyzer.db.get_stats(username)
+    total = stats.get('total_commits', 0)
+    yield {'status': 'progress', 'message': f'Total commits: {total}'}
+
+    # Fetch some LOC data
+    yield {'status': 'progress', 'message': 'Fetching LOC data...'}
+    fetched = analyzer.fetch_loc_batch(username, 100)
+    yield {'status': 'progress', 'message': f'Fetched LOC for {fetched} commits'}
+
+    yield {'status': 'complete', 'message': f'Fetch complete for {username}'}
+
+
+def job_fetch_loc():
+    """Backfill LOC for the 500 highest-priority commits without it."""
+    analyzer.db.refresh_loc_queue()
+    rows = analyzer.db.get_commits_needing_loc(None, 500)
+
+    total = len(rows)
+    yield {'status': 'starting', 'total': total, 'workers': LOC_WORKERS}
+
+    success = 0
+    errors = 0
+    started = time.time()
+
+    for i, (_, additions, _) in enumerate(analyzer.iter_loc_stats(rows)):
+        if additions is not None:
+            success += 1
+        else:
+            errors += 1
 
-        # Save user
-        analyzer.db.save_user(user_data)
-        name = user_data.get("name", username)
-        yield f'data: {{"status": "progress", "message": "Profile saved: {name}"}}\n\n'
+        if (i + 1) % 20 == 0:
+            rate = (i + 1) / max(time.time() - started, 1e-6)
+            yield {'status': 'progress', 'processed': i + 1, 'total': total, 'success': success,
+                   'errors': errors, 'rate': round(rate, 1)}
 
-        # Fetch commits
-        yield f'data: {{"status": "progress", "message": "Fetching commits since {START_DATE}..."}}\n\n'
+    rate = total / max(time.time() - started, 1e-6)
+    yield {'status': 'complete', 'success': success, 'errors': errors, 'rate': round(rate, 1)}
 
-        end_date = datetime.now().date()
-        current = START_DATE
-        total_commits = 0
 
-        while current <= end_date:
-            year, month = current.year, current.month
-            yield f'data: {{"status": "progress", "message": "Fetching {year}-{month:02d}..."}}\n\n'
+def job_fetch_languages():
+    """Fetch language stats for repos that have none yet."""
+    # Get all unique repos
+    conn = analyzer.db._get_read_conn()
+    repos = conn.execute('''
+        SELECT DISTINCT repo, username FROM commits
+        WHERE repo IS NOT NULL AND repo != ''
+    ''').fetchall()
 
-            commits = analyzer.fetch_commits_for_month(username, year, month)
-            saved = analyzer.db.save_commits(commits)
-            total_commits += len(commits)
-            yield f'data: {{"status": "progress", "message": "  Found {len(commits)} commits"}}\n\n'
+    # Check which ones need fetching
+    need_fetch = []
+    for row in repos:
+        repo, username = row['repo'], row['username']
+        existing = conn.execute('SELECT 1 FROM languages WHERE repo = ?', (repo,)).fetchone()
+        if not existing:
+            need_fetch.append((repo, username))
+
+    total = len(need_fetch)
+    yield {'status': 'starting', 'total': total}
 
-            analyzer.db.mark_month_fetched(username, year, month)
+    success = 0
+    errors = 0
 
-            if month == 12:
-                current = date(year + 1, 1, 1)
+    for i, (repo, username) in enumerate(need_fetch):
+        try:
+            status, languages = GitHubAPI.get_json(f'https://api.github.com/repos/{repo}/languages', timeout=10)
+            if status == 200:
+                conn = analyzer.db._get_conn()
+                with conn:
+                    for lang, bytes_count in languages.items():
+                        conn.execute('''
+                            INSERT OR REPLACE INTO languages (repo, username, language, bytes, fetched_at)
+                            VALUES (?, ?, ?, ?, ?)
+                        ''', (repo, username, lang, bytes_count, datetime.now().isoformat()))
+                    analyzer.db._bump_generation(conn)
+                success += 1
             else:
-                current = date(year, month + 1, 1)
+                errors += 1
+        except Exception:
+            errors += 1
+
+        if (i + 1) % 10 == 0:
+            yield {'status': 'progress', 'processed': i + 1, 'total': total, 'success': success, 'errors': errors}
+
+    yield {'status': 'complete', 'success': success, 'errors': errors}
 
-        stats = analyzer.db.get_stats(username)
-        total = stats.get('total_commits', 0)
-        yield f'data: {{"status": "progress", "message": "Total commits: {total}"}}\n\n'
 
-        # Fetch some LOC data
-        yield f'data: {{"status": "progress", "message": "Fetching LOC data..."}}\n\n'
-        fetched = analyzer.fetch_loc_batch(username, 100)
-        yield f'data: {{"status": "progress", "message": "Fetched LOC for {fetched} commits"}}\n\n'
+JOB_HANDLERS = {
+    'fetch_user': job_fetch_user,
+    'fetch_loc': job_fetch_loc,
+    'fetch_languages': job_fetch_languages,
+}
 
-        yield f'data: {{"status": "complete", "message": "Fetch complete for {username}"}}\n\n'
+JOBS = JobQueue(analyzer.db, JOB_HANDLERS, JOB_WORKERS)
+
+
+def job_event_stream(job_id: int, after: int = 0):
+    """Server-sent events following a job from seq `after`; disconnecting leaves the job running."""
+    job = analyzer.db.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    if job['status'] in JOB_FINISHED and after >= job['last_seq']:
+        return Response(status=204)  # nothing left to send; tells EventSource not to reconnect
+
+    def generate():
+        for event in JOBS.follow(job_id, after):
+            if event is None:
+                yield ': keep-alive\n\n'
+            else:
+                seq, data = event
+                yield f'id: {job_id}:{seq}\ndata: {data}\n\n'
 
     return Response(generate(), mimetype='text/event-stream',
-                   headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def last_event_id() -> tuple:
+    """(job_id, seq) from a reconnecting EventSource's Last-Event-ID, or (None, 0)."""
+    job_id, _, seq = request.headers.get('Last-Event-ID', '').partition(':')
+    if job_id.isdigit() and seq.isdigit():
+        return int(job_id), int(seq)
+    return None, 0
+
+
+def stream_job(kind: str, **params):
+    """Submit a job, or join the identical one already active, and stream its progress.
+
+    A reconnecting EventSource picks up the job it was following, even if that
+    job has finished since, rather than starting another run.
+    """
+    job_id, after = last_event_id()
+    if job_id is None:
+        job_id = JOBS.submit(kind, params)
+    return job_event_stream(job_id, after)
+
+
+@app.route('/api/jobs', methods=['GET', 'POST'])
+def jobs_api():
+    """List recent jobs, or submit one from a JSON body {"kind": ..., "params": {...}}."""
+    if request.method == 'GET':
+        return jsonify({'success': True, 'jobs': analyzer.db.get_jobs(request.args.get('limit', 50, type=int))})
+    body = request.get_json(silent=True) or {}
+    try:
+        job_id = JOBS.submit(body.get('kind'), body.get('params'))
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'job': analyzer.db.get_job(job_id)}), 202
+
+
+@app.route('/api/jobs/<int:job_id>')
+def get_job(job_id):
+    """A job's status and its events after ?after=, for clients that poll instead of streaming."""
+    job = analyzer.db.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    events = [dict(json.loads(data), seq=seq)
+              for seq, data in analyzer.db.get_job_events(job_id, request.args.get('after', 0, type=int))]
+    return jsonify({'success': True, 'job': job, 'events': events})
+
+
+@app.route('/api/jobs/<int:job_id>/events')
+def get_job_events(job_id):
+    """Stream a job's progress without submitting anything."""
+    resumed_id, after = last_event_id()
+    if resumed_id != job_id:
+        after = request.args.get('after', 0, type=int)
+    return job_event_stream(job_id, after)
+
+
+@app.route('/api/fetch/<username>')
+def fetch_user(username):
+    """Fetch all data for a new user with live progress streaming."""
+    return stream_job('fetch_user', username=username)
 
 
 @app.route('/api/fetch-status')
 def fetch_status():
     """Get current fetch status showing what data exists vs needs fetching."""
-    conn = analyzer.db._get_conn()
+    conn = analyzer.db._get_read_conn()
 
     status = {}
     for username in GITHUB_USERS:
-        total = conn.execute('SELECT COUNT(*) FROM commits WHERE username = ?', (username,)).fetchone()[0]
-        with_loc = conn.execute('SELECT COUNT(*) FROM commits WHERE username = ? AND additions IS NOT NULL', (username,)).fetchone()[0]
-        without_loc = total - with_loc
-
-        # LOC totals
         totals = conn.execute('''
-            SELECT COALESCE(SUM(additions), 0) as adds, COALESCE(SUM(deletions), 0) as dels
-            FROM commits WHERE username = ? AND additions IS NOT NULL
+            SELECT COALESCE(SUM(commits), 0) as total, COALESCE(SUM(loc_commits), 0) as with_loc,
+                COALESCE(SUM(additions), 0) as adds, COALESCE(SUM(deletions), 0) as dels
+            FROM daily_rollup WHERE username = ?
         ''', (username,)).fetchone()
+        total = totals['total']
+        with_loc = totals['with_loc']
+        without_loc = total - with_loc
 
         status[username] = {
             'total_commits': total,
@@ -1679,9 +3544,11 @@ def fetch_status():
         }
 
     # Combined stats
-    total = conn.execute('SELECT COUNT(*) FROM commits').fetchone()[0]
-    with_loc = conn.execute('SELECT COUNT(*) FROM commits WHERE additions IS NOT NULL').fetchone()[0]
-    totals = conn.execute('SELECT COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0) FROM commits WHERE additions IS NOT NULL').fetchone()
+    total, with_loc, *totals = conn.execute('''
+        SELECT COALESCE(SUM(commits), 0), COALESCE(SUM(loc_commits), 0),
+            COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0)
+        FROM daily_rollup
+    ''').fetchone()
 
     status['_combined'] = {
         'total_commits': total,
@@ -1693,172 +3560,164 @@ def fetch_status():
         'net_loc': totals[0] - totals[1]
     }
 
-    conn.close()
     return jsonify({'success': True, 'status': status})
 
 
 @app.route('/api/fetch-loc-stream')
 def fetch_loc_stream():
     """Stream LOC fetch progress."""
-    from flask import Response
-
-    def generate():
-        conn = analyzer.db._get_conn()
-
-        # Get commits needing LOC
-        rows = conn.execute('''
-            SELECT sha, repo FROM commits
-            WHERE additions IS NULL
-            ORDER BY date DESC
-            LIMIT 500
-        ''').fetchall()
-        conn.close()
-
-        total = len(rows)
-        yield f'data: {{"status": "starting", "total": {total}}}\n\n'
-
-        success = 0
-        errors = 0
-
-        for i, row in enumerate(rows):
-            sha, repo = row['sha'], row['repo']
-
-            try:
-                resp = requests.get(
-                    f'https://api.github.com/repos/{repo}/commits/{sha}',
-                    headers=REST_HEADERS, timeout=10
-                )
-                if resp.status_code == 200:
-                    stats = resp.json().get('stats', {})
-                    adds = stats.get('additions', 0)
-                    dels = stats.get('deletions', 0)
-
-                    conn = analyzer.db._get_conn()
-                    conn.execute('UPDATE commits SET additions=?, deletions=? WHERE sha=?', (adds, dels, sha))
-                    conn.commit()
-                    conn.close()
-                    success += 1
-                else:
-                    errors += 1
-            except:
-                errors += 1
-
-            if (i + 1) % 20 == 0:
-                yield f'data: {{"status": "progress", "processed": {i+1}, "total": {total}, "success": {success}, "errors": {errors}}}\n\n'
-
-            time.sleep(0.1)  # Rate limit
-
-        yield f'data: {{"status": "complete", "success": {success}, "errors": {errors}}}\n\n'
-
-    return Response(generate(), mimetype='text/event-stream',
-                   headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    return stream_job('fetch_loc')
 
 
 @app.route('/api/fetch-languages')
 def fetch_languages_api():
     """Fetch language stats for all repos."""
-    from flask import Response
-
-    def generate():
-        # Get all unique repos
-        conn = analyzer.db._get_conn()
-        repos = conn.execute('''
-            SELECT DISTINCT repo, username FROM commits
-            WHERE repo IS NOT NULL AND repo != ''
-        ''').fetchall()
-        conn.close()
-
-        # Check which ones need fetching
-        need_fetch = []
-        for row in repos:
-            repo, username = row['repo'], row['username']
-            conn = analyzer.db._get_conn()
-            existing = conn.execute('SELECT 1 FROM languages WHERE repo = ?', (repo,)).fetchone()
-            conn.close()
-            if not existing:
-                need_fetch.append((repo, username))
-
-        total = len(need_fetch)
-        yield f'data: {{"status": "starting", "total": {total}}}\n\n'
-
-        success = 0
-        errors = 0
-
-        for i, (repo, username) in enumerate(need_fetch):
-            try:
-                resp = requests.get(
-                    f'https://api.github.com/repos/{repo}/languages',
-                    headers=REST_HEADERS, timeout=10
-                )
-                if resp.status_code == 200:
-                    languages = resp.json()
-                    conn = analyzer.db._get_conn()
-                    for lang, bytes_count in languages.items():
-                        conn.execute('''
-                            INSERT OR REPLACE INTO languages (repo, username, language, bytes, fetched_at)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (repo, username, lang, bytes_count, datetime.now().isoformat()))
-                    conn.commit()
-                    conn.close()
-                    success += 1
-                else:
-                    errors += 1
-            except:
-                errors += 1
-
-            if (i + 1) % 10 == 0:
-                yield f'data: {{"status": "progress", "processed": {i+1}, "total": {total}, "success": {success}, "errors": {errors}}}\n\n'
-
-            time.sleep(0.1)  # Rate limit
-
-        yield f'data: {{"status": "complete", "success": {success}, "errors": {errors}}}\n\n'
-
-    return Response(generate(), mimetype='text/event-stream',
-                   headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
-
-
-def export_static_site(output_dir: Path):
-    """Export static HTML dashboard."""
+    return stream_job('fetch_languages')
+
+
+# Bump when the layout of exported per-view files changes, so old ones are rebuilt
+EXPORT_VERSION = 1
+
+
+def write_precompressed(path: Path):
+    """Write path.gz (and path.br when brotli is installed) for hosts that serve them."""
+    body = path.read_bytes()
+    path.with_name(path.name + '.gz').write_bytes(compress_body(body, 'gzip', best=True))
+    if brotli:
+        path.with_name(path.name + '.br').write_bytes(compress_body(body, 'br', best=True))
+
+
+def split_db_chunks(path: Path, chunk_bytes: int) -> int:
+    """Split path into path.000, path.001, ... and describe them in path.json.
+
+    The description uses sql.js-httpvfs's "chunked" layout. Returns the
+    number of chunks; path itself is removed.
+    """
+    body = path.read_bytes()
+    count = max(1, -(-len(body) // chunk_bytes))
+    for i in range(count):
+        path.with_name(f'{path.name}.{i:03d}').write_bytes(body[i * chunk_bytes:(i + 1) * chunk_bytes])
+    path.with_name(f'{path.name}.json').write_text(json.dumps({
+        'serverMode': 'chunked',
+        'requestChunkSize': SQLJS_PAGE_SIZE,
+        'databaseLengthBytes': len(body),
+        'serverChunkSize': chunk_bytes,
+        'urlPrefix': f'{path.name}.',
+        'suffixLength': 3,
+    }, indent=2))
+    path.unlink()
+    return count
+
+
+def write_if_changed(path: Path, body: bytes, precompress: bool = False) -> bool:
+    """Write body to path unless it already holds exactly that; True if written."""
+    if path.exists() and path.read_bytes() == body:
+        return False
+    path.write_bytes(body)
+    if precompress:
+        write_precompressed(path)
+    return True
+
+
+def date_relative_stats(usernames: list) -> str:
+    """The stats of users that depend on today's date, as a fingerprint component."""
+    stats = analyzer.db.get_stats_for(usernames)
+    return json.dumps([stats[key] for key in (
+        'periods', 'current_streak', 'additions_30d_change', 'deletions_30d_change', 'years_coding')])
+
+
+def export_static_site(output_dir: Path, columnar: bool = True, full: bool = False, db_chunk_mb: int = 0):
+    """Export static HTML dashboard, rebuilding only what changed since the last export.
+
+    Each view (every user, plus 'All') is written to users/<view>.<content
+    hash>.json in the /api/user?viz=series form, so unchanged files keep their
+    names and stay cacheable. manifest.json records the input fingerprint
+    behind each file; a view whose fingerprint still matches is not rebuilt.
+    The fingerprint leaves the export date out: it covers the view's
+    date-relative stats (periods, current streak) instead, so a view is only
+    re-rendered on a new day if those changed, and timeline ranges end at the
+    client's date (see render_series). full=True ignores the manifest.
+
+    With columnar (the default) daily series are written as columns and
+    data.json is compact; otherwise rows, indented as before.
+
+    stats.db is a full copy of the database (StatsDB.backup), which the
+    scheduled build restores from. stats.sqljs.db is the slim
+    StatsDB.export_sqljs copy the dashboard queries, described by
+    stats.sqljs.db.json for range-request readers; with db_chunk_mb it is
+    split into chunks of that many MiB, listed in stats.sqljs.db.json instead.
+    """
     output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    views_dir = output_dir / 'users'
+    views_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / 'manifest.json'
 
     print(f'\nExporting static site to {output_dir}...')
 
-    all_data = {}
-    all_viz = {}
-    active_users = []
-
-    for username in GITHUB_USERS:
-        data = analyzer.get_user_data(username)
-        if data.get('stats') and data['stats'].get('total_commits', 0) > 0:
-            all_data[username] = data
-            all_viz[username] = create_visualizations(data)
-            active_users.append(username)
-
+    previous = {}
+    if manifest_path.exists() and not full:
+        previous = json.loads(manifest_path.read_text())
+        if previous.get('version') != EXPORT_VERSION:
+            previous = {}
+
+    totals = analyzer.db.get_user_totals(GITHUB_USERS)
+    active_users = [u for u in GITHUB_USERS if totals.get(u, {}).get('total_commits', 0) > 0]
+    fingerprints = analyzer.db.user_fingerprints(active_users)
+    stamp = f'{EXPORT_VERSION}:{int(columnar)}'
+    views = {username: hashlib.sha1(
+                f'{stamp}:{fingerprints[username]}:{date_relative_stats([username])}'.encode()).hexdigest()
+             for username in active_users}
     # Create combined "All" view if multiple users
     if len(active_users) > 1:
-        print('Creating combined view...')
-        combined_stats = get_combined_stats(active_users)
-        combined_daily = get_combined_daily(active_users)
-        combined_data = {
-            'user': {'username': 'All', 'name': f'Combined ({len(active_users)} users)'},
-            'stats': combined_stats,
-            'daily': combined_daily,
-            'yearly': [{'year': k, **v} for k, v in combined_stats['yearly'].items()],
-            'top_repos': [],
-            'top_repos_loc': [],
-            'monthly': [],
-            'recent': []
+        combined = ':'.join(fingerprints[u] for u in active_users)
+        views['All'] = hashlib.sha1(
+            f'{stamp}:all:{combined}:{date_relative_stats(active_users)}'.encode()).hexdigest()
+
+    entries = {}
+    rebuilt = 0
+    for view, fingerprint in views.items():
+        entry = previous.get('views', {}).get(view)
+        if entry and entry['fingerprint'] == fingerprint and (output_dir / entry['file']).exists():
+            entries[view] = entry
+            continue
+
+        print(f'  Rendering {view}...')
+        data = analyzer.get_combined_data(active_users) if view == 'All' else analyzer.get_user_data(view)
+        payload = {
+            'success': True,
+            'data': columnar_data(data) if columnar else data,
+            'visualizations': create_visualizations(data, series=True),
+            'layout': SERIES_LAYOUT,
         }
-        all_data['All'] = combined_data
-        all_viz['All'] = create_visualizations(combined_data)
-        active_users.insert(0, 'All')
-
+        if columnar:
+            payload['format'] = 'columnar'
+        body = json.dumps(payload, default=str, separators=(',', ':')).encode()
+        name = f'users/{view}.{hashlib.sha256(body).hexdigest()[:16]}.json'
+        write_if_changed(output_dir / name, body, precompress=True)
+        entries[view] = {'fingerprint': fingerprint, 'file': name, 'bytes': len(body)}
+        rebuilt += 1
+
+    # Drop files (and their .gz/.br copies) no view points at any more
+    current = {Path(entry['file']).name for entry in entries.values()}
+    for path in views_dir.iterdir():
+        if path.name.removesuffix('.gz').removesuffix('.br') not in current:
+            path.unlink()
+
+    view_names = list(views)
+    if 'All' in views:
+        view_names.insert(0, view_names.pop())  # Put "All" first
+    payloads = {view: json.loads((output_dir / entries[view]['file']).read_text()) for view in view_names}
+
+    # Inline index: profiles and totals only; each view's file is fetched when shown
+    users, index = user_index(active_users, active_users)
+    for entry in index.values():
+        entry['partial'] = True
     static_data = {
         'success': True,
-        'data': all_data,
-        'visualizations': all_viz,
-        'users': active_users
+        'data': index,
+        'visualizations': {},
+        'files': {view: entries[view]['file'] for view in view_names},
+        'users': users
     }
     
     # Read template
@@ -1874,33 +3733,79 @@ def export_static_site(output_dir: Path):
     # Modify initApp fetch to use static data (be specific to avoid breaking initSqlDatabase)
     html_before = html
     html = html.replace(
-        "const response = await fetch('/api/data');",
-        "if (window.STATIC_DATA) { allData = window.STATIC_DATA; setupUserButtons(allData.users, allData.data); updateView(); return; }\n            const response = await fetch('/api/data');"
+        "const data = await loadIndex();",
+        "if (window.STATIC_DATA) { allData = window.STATIC_DATA; setupUserButtons(allData.users, allData.data); updateView(); return; }\n                const data = await loadIndex();"
     )
     if html == html_before:
         print("  Warning: Static data injection pattern not found!")
     
     # Update title
-    user_names = [u for u in active_users if u != 'All']
     html = html.replace('<title>GitHub Stats</title>',
-                       f'<title>GitHub Stats - {" & ".join(user_names)}</title>')
+                       f'<title>GitHub Stats - {" & ".join(active_users)}</title>')
     
     # Update footer with generation date
     html = html.replace('github.com/zeekay/stats</a></p>',
         f'github.com/zeekay/stats</a> | Generated {datetime.now().strftime("%Y-%m-%d")}</p>')
-    
-    # Write files
-    (output_dir / 'index.html').write_text(html)
-    (output_dir / 'data.json').write_text(json.dumps(static_data, default=str, indent=2))
 
-    # Copy database file for sql.js client-side queries
-    import shutil
-    if DB_PATH.exists():
-        shutil.copy(DB_PATH, output_dir / 'stats.db')
-        print(f'  Created {output_dir}/stats.db')
+    # Full dump for scripts, assembled from the per-view files rather than re-rendered
+    dump = {
+        'success': True,
+        'data': {view: payloads[view]['data'] for view in view_names},
+        'visualizations': {view: payloads[view]['visualizations'] for view in view_names},
+        'layout': SERIES_LAYOUT,
+        'users': view_names
+    }
+    if columnar:
+        dump['format'] = 'columnar'
+        dump_json = json.dumps(dump, default=str, separators=(',', ':'))
+    else:
+        dump_json = json.dumps(dump, default=str, indent=2)
+
+    # Write files
+    written = [name for name, body in (('index.html', html), ('data.json', dump_json))
+               if write_if_changed(output_dir / name, body.encode(), precompress=True)]
+
+    # Full database for restoring, and the slim one for sql.js client-side
+    # queries, unless nothing was written since the last export (and the slim
+    # one is laid out the same way)
+    generation = analyzer.db.generation()
+    backup_file = output_dir / 'stats.db'
+    db_file = output_dir / 'stats.sqljs.db'
+    chunk_bytes = db_chunk_mb * 1024 * 1024
+    db_current = (previous.get('generation') == generation
+                  and previous.get('db_chunk_bytes', 0) == chunk_bytes
+                  and backup_file.exists()
+                  and (output_dir / 'stats.sqljs.db.json').exists()
+                  and (chunk_bytes or db_file.exists()))
+    if DB_PATH.exists() and not db_current:
+        # stats.db.* are the slim copy's files from exports that named it stats.db
+        for stale in [*output_dir.glob('stats.db.*'), *output_dir.glob('stats.sqljs.db.*')]:
+            stale.unlink()
+        analyzer.db.backup(backup_file)
+        written.append('stats.db')
+        generation = analyzer.db.export_sqljs(db_file)
+        if chunk_bytes:
+            chunks = split_db_chunks(db_file, chunk_bytes)
+            written.append(f'stats.sqljs.db.json ({chunks} chunks)')
+        else:
+            # Static hosts serve byte ranges, so the dashboard can read it lazily too
+            config = sqljs_config(db_file, generation, f'stats.sqljs.db?g={generation}')
+            (output_dir / 'stats.sqljs.db.json').write_text(json.dumps(config, indent=2))
+            written.append('stats.sqljs.db')
+
+    manifest = {
+        'version': EXPORT_VERSION,
+        'generated': datetime.now().isoformat(),
+        'generation': generation,
+        'db_chunk_bytes': chunk_bytes,
+        'views': entries,
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2))
 
-    print(f'  Created {output_dir}/index.html')
-    print(f'  Created {output_dir}/data.json')
+    print(f'  Rendered {rebuilt} of {len(views)} views; {len(views) - rebuilt} unchanged')
+    for name in written:
+        print(f'  Wrote {output_dir}/{name}')
+    print(f'  Precompressed copies are .gz{" and .br" if brotli else ""}')
     print(f'\nPreview: python -m http.server -d {output_dir} 8000')
 
 
@@ -1909,9 +3814,20 @@ if __name__ == '__main__':
     
     parser = argparse.ArgumentParser(description='GitHub Stats - Analyze your contribution history')
     parser.add_argument('--export', type=str, metavar='DIR', help='Export static site')
+    parser.add_argument('--export-rows', action='store_true', help='Export daily series as rows, not columns')
+    parser.add_argument('--export-full', action='store_true', help='Re-render every view, ignoring the export manifest')
+    parser.add_argument('--db-chunk-mb', type=int, default=0, metavar='MB',
+                        help='Split the exported stats.sqljs.db into chunks of this many MiB')
+    parser.add_argument('--sync', action='store_true',
+                        help='Fetch new commits, searching the current month from each user\'s watermark')
+    parser.add_argument('--full-sync', action='store_true', help='Fetch new commits, searching the whole current month')
     parser.add_argument('--fetch-loc', action='store_true', help='Fetch all LOC data')
+    parser.add_argument('--workers', type=int, default=LOC_WORKERS, help='Concurrent LOC requests')
     parser.add_argument('--stats', action='store_true', help='Show statistics')
     parser.add_argument('--migrate', action='store_true', help='Migrate from JSONL to SQLite')
+    parser.add_argument('--rebuild-rollup', action='store_true', help='Rebuild daily rollup from commits')
+    parser.add_argument('--rebuild-search', action='store_true', help='Rebuild the commit search index')
+    parser.add_argument('--vacuum', action='store_true', help='Compact the database and rebuild the search index')
     
     args = parser.parse_args()
     
@@ -1932,13 +3848,22 @@ if __name__ == '__main__':
             print(f'  Total +{stats["total_additions"]:,} / -{stats["total_deletions"]:,}')
             print(f'  Net: {stats["net_loc"]:+,}')
     
+    elif args.sync or args.full_sync:
+        found = analyzer.sync_users(GITHUB_USERS, incremental=not args.full_sync)
+        for username in GITHUB_USERS:
+            print(f'{username}: {found.get(username, 0):,} commits found')
+
     elif args.fetch_loc:
         for username in GITHUB_USERS:
             print(f'\n{username}:')
+            total = 0
+            started = time.time()
             while True:
-                fetched = analyzer.fetch_loc_batch(username, 500)
+                fetched = analyzer.fetch_loc_batch(username, 500, args.workers)
+                total += fetched
                 if fetched == 0:
-                    print('  Done')
+                    rate = total / max(time.time() - started, 1e-6)
+                    print(f'  Done: {total} commits at {rate:.1f} commits/s')
                     break
     
     elif args.migrate:
@@ -1986,14 +3911,34 @@ if __name__ == '__main__':
                     c['additions'], c['deletions'] = loc_data[c['sha']]
             
             # Save to SQLite
-            analyzer.db.save_commits(commits)
-            print(f'  Migrated {len(commits)} commits')
+            saved = analyzer.db.save_commits(commits)
+            print(f'  Migrated {len(commits)} commits ({saved} inserted, {len(commits) - saved} already present)')
     
+    elif args.rebuild_rollup:
+        rows = analyzer.db.rebuild_daily_rollup()
+        print(f'\nRebuilt daily rollup: {rows:,} user-days')
+
+    elif args.rebuild_search:
+        if not analyzer.db.fts:
+            print('\nThis SQLite build has no FTS5; search scans commits instead')
+        else:
+            rows = analyzer.db.rebuild_search_index()
+            print(f'\nRebuilt search index: {rows:,} commits')
+
+    elif args.vacuum:
+        analyzer.db.vacuum()
+        print(f'\nVacuumed {DB_PATH} ({DB_PATH.stat().st_size / 1024 / 1024:.1f} MB)')
+
     elif args.export:
-        export_static_site(Path(args.export))
+        export_static_site(Path(args.export), columnar=not args.export_rows, full=args.export_full,
+                           db_chunk_mb=args.db_chunk_mb)
     
     else:
         print(f'Port: {PORT}\n')
+        # Resume queued jobs now rather than on the next submit; under the debug
+        # reloader only the child process serves requests, so only it runs jobs
+        if not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            JOBS.start()
         if DEBUG:
             app.run(debug=True, port=PORT)
         else:
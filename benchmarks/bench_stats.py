@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark StatsDB.get_stats and compute_streaks on synthetic histories.
+
+Times the two-scan aggregation against the per-metric queries get_stats used
+to run, one query per count, sum, distinct and period window, the combined
+stats merged from cached per-user partials, and the NumPy streak computation
+against the per-date loop it replaced.
+
+Usage:
+    python benchmarks/bench_stats.py [--commits 100000] [--streak-years 20] [--runs 5]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+USERS = ['alice', 'bob']
+REPOS = [f'org{i}/repo{j}' for i in range(10) for j in range(20)]
+
+# One query per metric, as get_stats ran them before the single-pass rewrite
+PER_METRIC_QUERIES = [
+    'SELECT COUNT(*) FROM commits WHERE username = ?',
+    'SELECT COUNT(*) FROM commits WHERE username = ? AND additions IS NOT NULL',
+    'SELECT COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0) FROM commits WHERE username = ?',
+    'SELECT MIN(date), MAX(date) FROM commits WHERE username = ?',
+    'SELECT COUNT(DISTINCT date) FROM commits WHERE username = ?',
+    'SELECT COUNT(DISTINCT repo) FROM commits WHERE username = ?',
+    'SELECT date, COUNT(*) as cnt FROM commits WHERE username = ? GROUP BY date ORDER BY cnt DESC LIMIT 1',
+    "SELECT strftime('%w', date), COUNT(*) as commits FROM commits WHERE username = ? "
+    "GROUP BY strftime('%w', date) ORDER BY commits DESC",
+    "SELECT strftime('%Y', date) as year, COUNT(*), COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0), "
+    "COUNT(DISTINCT date) FROM commits WHERE username = ? GROUP BY strftime('%Y', date) ORDER BY year",
+    'SELECT DISTINCT date FROM commits WHERE username = ? ORDER BY date',
+    'SELECT AVG(additions + deletions) FROM commits WHERE username = ? AND additions IS NOT NULL',
+]
+PERIOD_QUERY = '''
+    SELECT COUNT(*), COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0),
+        COUNT(DISTINCT date), COUNT(DISTINCT repo)
+    FROM commits WHERE username = ? AND date >= ?
+'''
+PREV_30D_QUERY = '''
+    SELECT COALESCE(SUM(additions), 0), COALESCE(SUM(deletions), 0)
+    FROM commits WHERE username = ? AND date >= ? AND date < ?
+'''
+
+
+def seed(db_path: Path, count: int):
+    """Write users and random commits straight to SQLite; StatsDB adds the rest of the schema."""
+    rng = random.Random(1)
+    start = date(2010, 1, 1)
+    span = (date.today() - start).days
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE users (username TEXT PRIMARY KEY, avatar_url TEXT, name TEXT, bio TEXT,
+            company TEXT, location TEXT, blog TEXT, followers INTEGER DEFAULT 0,
+            following INTEGER DEFAULT 0, public_repos INTEGER DEFAULT 0, created_at TEXT, updated_at TEXT);
+        CREATE TABLE commits (sha TEXT PRIMARY KEY, username TEXT NOT NULL, date TEXT NOT NULL,
+            repo TEXT, message TEXT, url TEXT, additions INTEGER, deletions INTEGER, fetched_at TEXT);
+    ''')
+    conn.executemany('INSERT INTO users (username) VALUES (?)', [(u,) for u in USERS])
+    rows = []
+    for i in range(count):
+        has_loc = rng.random() < 0.8
+        rows.append((
+            f'{i:040x}', rng.choice(USERS),
+            (start + timedelta(days=rng.randint(0, span))).isoformat(),
+            rng.choice(REPOS), f'commit {i}', None,
+            rng.randint(0, 500) if has_loc else None,
+            rng.randint(0, 300) if has_loc else None,
+        ))
+    conn.executemany('INSERT INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)', rows)
+    conn.commit()
+    conn.close()
+
+
+def per_metric_stats(conn, username: str):
+    """Run the per-metric queries for one user."""
+    today = date.today()
+    for query in PER_METRIC_QUERIES:
+        conn.execute(query, (username,)).fetchall()
+    for days in (7, 30, 90, 365):
+        conn.execute(PERIOD_QUERY, (username, (today - timedelta(days=days)).isoformat())).fetchall()
+    conn.execute(PERIOD_QUERY, (username, f'{today.year}-01-01')).fetchall()
+    conn.execute(PREV_30D_QUERY, (username, (today - timedelta(days=60)).isoformat(),
+                                  (today - timedelta(days=30)).isoformat())).fetchall()
+
+
+def loop_streaks(dates: list, today: date) -> tuple:
+    """(current, longest) streak the way get_stats computed it before compute_streaks."""
+    current_streak = 0
+    longest_streak = 0
+    if dates:
+        if dates[-1] in (today.isoformat(), (today - timedelta(days=1)).isoformat()):
+            current_streak = 1
+            for i in range(len(dates) - 2, -1, -1):
+                d1 = datetime.strptime(dates[i], '%Y-%m-%d')
+                d2 = datetime.strptime(dates[i + 1], '%Y-%m-%d')
+                if (d2 - d1).days == 1:
+                    current_streak += 1
+                else:
+                    break
+        streak = 1
+        for i in range(1, len(dates)):
+            d1 = datetime.strptime(dates[i - 1], '%Y-%m-%d')
+            d2 = datetime.strptime(dates[i], '%Y-%m-%d')
+            if (d2 - d1).days == 1:
+                streak += 1
+            else:
+                longest_streak = max(longest_streak, streak)
+                streak = 1
+        longest_streak = max(longest_streak, streak)
+    return current_streak, longest_streak
+
+
+def active_dates(years: int, today: date) -> list:
+    """Sorted ISO dates over `years` of history, active on roughly six days in seven."""
+    rng = random.Random(2)
+    start = today - timedelta(days=365 * years)
+    return [(start + timedelta(days=i)).isoformat()
+            for i in range((today - start).days + 1) if rng.random() < 0.85]
+
+
+def best_of(runs: int, func) -> float:
+    """Best wall time of func over runs, in seconds."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark StatsDB.get_stats and compute_streaks')
+    parser.add_argument('--commits', type=int, default=100_000, help='Synthetic commits to generate')
+    parser.add_argument('--streak-years', type=int, default=20, help='Years of daily history for streaks')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per variant (best is reported)')
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='stats-bench-'))
+    db_path = workdir / 'bench.db'
+    print(f'Seeding {args.commits:,} commits into {db_path}...')
+    seed(db_path, args.commits)
+
+    # Configure app before import: seeded users with profiles means startup has nothing to fetch
+    os.environ['DB_PATH'] = str(db_path)
+    os.environ['GITHUB_USERS'] = ','.join(USERS)
+    os.chdir(workdir)  # keep a local stats.json from overriding the config
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    import app
+
+    db = app.analyzer.db
+    conn = db._get_read_conn()
+
+    def cold(func):
+        """func with the per-user stats partials dropped first, as after a write."""
+        return lambda: (db._partials.clear(), func())
+
+    per_metric = best_of(args.runs, lambda: [per_metric_stats(conn, u) for u in USERS])
+    single_pass = best_of(args.runs, cold(lambda: [db.get_stats(u) for u in USERS]))
+    combined = best_of(args.runs, cold(lambda: db.get_stats_for(USERS)))
+    merged = best_of(args.runs, lambda: db.get_stats_for(USERS))
+
+    print(f'per-metric queries:  {per_metric * 1000:8.1f} ms ({len(USERS)} users)')
+    print(f'get_stats:           {single_pass * 1000:8.1f} ms ({len(USERS)} users)')
+    print(f'get_stats_for (all): {combined * 1000:8.1f} ms')
+    print(f'  cached partials:   {merged * 1000:8.1f} ms')
+    print(f'speedup:             {per_metric / single_pass:8.1f}x')
+
+    today = date.today()
+    dates = active_dates(args.streak_years, today)
+    streaks = app.compute_streaks(dates, today)
+    assert (streaks['current'], streaks['longest']) == loop_streaks(dates, today)
+    loop = best_of(args.runs, lambda: loop_streaks(dates, today))
+    vectorized = best_of(args.runs, lambda: app.compute_streaks(dates, today))
+
+    print(f'\nStreaks over {args.streak_years} years ({len(dates):,} active days, '
+          f'longest {streaks["longest"]}):')
+    print(f'per-date loop:       {loop * 1000:8.2f} ms')
+    print(f'compute_streaks:     {vectorized * 1000:8.2f} ms')
+    print(f'speedup:             {loop / vectorized:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()